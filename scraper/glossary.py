@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Offline, deterministic translation tier for titles and variant names.
+
+The rule tables that used to live (unused) inside scraper.py's main() are
+compiled into one alternation regex per table, longest term first, so a string
+is translated in a single left-to-right pass instead of one re.sub/str.replace
+per term.
+
+translate_title_simple() / translate_variant_simple() keep their old best-effort
+behaviour. resolve_title() / resolve_variant() are strict: they only return a
+translation when every part of the string was covered by the glossary, and
+translate.py uses them to skip Gemini for strings like "黑色" or "狼棕色 CB".
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+CHINESE_RE = re.compile(r'[\u4e00-\u9fff]')
+BRACKETS_RE = re.compile(r'[【】\[\]（）()]')
+CHUNK_SPLIT_RE = re.compile(r'[\s,/，、]+')
+VARIANT_CODE_RE = re.compile(r'\b(MC|CP|BK|RG|CB|WG|BCP|M1|M2|KEN)\b', re.IGNORECASE)
+FILLER_WORDS = {'the', 'of', 'and', 'or', 'only', 'with', 'for'}
+
+# Common tactical gear terms for product titles
+TITLE_TERMS = {
+    '战术背心': 'Tactical Vest', '通用型': 'Universal',
+    'MOLLE系统': 'MOLLE System', 'MOLLE 系统': 'MOLLE System',
+    '手机导航面板': 'Phone Navigation Panel',
+    '胸口PDA包': 'Chest Bag', '胸包': 'Chest Bag', '胸前包': 'Chest Bag',
+    '多功能': 'Multi-Function', '户外': 'Outdoor', '配件': 'Accessories',
+    '战术耳机': 'Tactical Headset', '转接器': 'Adapter',
+    '民用': 'Civilian', 'PTT按键': 'PTT Button', '发射': 'Transmit',
+    '对讲机': 'Radio', '建伍': 'Kenwood', '接口': 'Interface',
+    '支持': 'Compatible', '手枪箱': 'Pistol Case', '枪箱': 'Gun Case',
+    '手雷': 'Grenade', '玩具': 'Toy', '可爆炸水弹': 'Water Bomb',
+    '弹射烟雾': 'Smoke Ejection', '手榴弹模型': 'Grenade Model',
+    '男孩生日礼物': 'Boys Birthday Gift', '儿童': 'Kids',
+    '头盔': 'Helmet', '护目镜': 'Goggles', '手套': 'Gloves',
+    '腰带': 'Belt', '水壶': 'Canteen', '弹匣': 'Magazine',
+}
+
+# Known color/pattern/size terms for variant names
+VARIANT_TERMS = {
+    '黑色': 'Black', '狼灰色': 'Wolf Grey', '灰色': 'Grey', '灰': 'Grey',
+    '游骑兵绿色': 'Ranger Green', '军绿色': 'Army Green', '绿色': 'Green',
+    '狼棕色': 'Coyote Brown', '棕色': 'Brown', '卡其': 'Khaki',
+    '白色': 'White', '红色': 'Red', '蓝色': 'Blue', '黄色': 'Yellow',
+    '暗夜迷彩': 'Black Camouflage Pattern', '迷彩': 'Camouflage', '丛林迷彩': 'Jungle Camouflage',
+    '沙色': 'Sand', '土狼棕': 'Coyote Brown', '土狼': 'Coyote',
+    '建伍': 'Kenwood', '摩托罗拉': 'Motorola', '单插': 'Single', '双插': 'Dual',
+    '大号': 'Large', '中号': 'Medium', '小号': 'Small',
+}
+
+# Brand/filler words dropped from variant names
+VARIANT_FILLER = [
+    '品牌', '考度拉', '科杜拉', '尼龙', '原厂', '正品', '仅支持', '伯莱塔', 'SIG印字', 'M9A3印字',
+    'M9A4印字', '加大款', '无LOGO', '通用款', '专用', '空箱', '带海绵内衬',
+]
+
+
+class Glossary:
+    """A term table compiled into one regex (longest term wins at each position)."""
+
+    def __init__(self, terms: Dict[str, str]):
+        self.terms = dict(terms)
+        ordered = sorted(self.terms, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(term) for term in ordered))
+
+    def replace(self, text: str) -> str:
+        """Replace every term in one pass; English terms are space-separated from their neighbours."""
+        out = self.pattern.sub(lambda m: f" {self.terms[m.group(0)]} ", text)
+        return re.sub(r"\s+", " ", out).strip()
+
+
+TITLE_GLOSSARY = Glossary(TITLE_TERMS)
+VARIANT_GLOSSARY = Glossary(VARIANT_TERMS)
+VARIANT_FILLER_RE = re.compile('|'.join(re.escape(w) for w in sorted(VARIANT_FILLER, key=len, reverse=True)))
+
+
+def _dedupe_words(text: str) -> str:
+    seen = set()
+    words = []
+    for word in text.split():
+        if word.lower() not in seen:
+            words.append(word)
+            seen.add(word.lower())
+    return ' '.join(words)
+
+
+def _title_pass(zh: str) -> str:
+    out = TITLE_GLOSSARY.replace(zh)
+    # Remove decorative symbols/brackets
+    out = re.sub(r"[【】\[\]（）()]+", " ", out)
+    return _dedupe_words(re.sub(r"\s+", " ", out).strip())[:120]
+
+
+def _variant_chunks(zh: str) -> Iterable[Tuple[str, bool]]:
+    """Translate a variant name chunk by chunk; yields (translation, fully_resolved)."""
+    s = BRACKETS_RE.sub(' ', zh)
+    for chunk in CHUNK_SPLIT_RE.split(s):
+        if not chunk:
+            continue
+        # Keep codes like MC/BK/RG/CB/WG/BCP if present
+        m = VARIANT_CODE_RE.search(chunk)
+        code = m.group(1).upper() if m else None
+        trans = VARIANT_GLOSSARY.replace(chunk)
+        resolved = not CHINESE_RE.search(trans)
+        if not resolved:
+            trans = code or ''
+        # Normalize like "MC Camouflage"
+        if code and 'Camouflage' in trans and code not in trans:
+            trans = f"{code} Camouflage"
+        yield trans, resolved
+
+
+def translate_title_simple(zh: str) -> str:
+    """Best-effort glossary translation of a title; returns zh if it stays mostly Chinese."""
+    if not zh:
+        return ''
+    result = _title_pass(zh)
+    if len(CHINESE_RE.findall(result)) > len(result) * 0.5:
+        return zh
+    return result
+
+
+def translate_variant_simple(zh: str) -> str:
+    """Best-effort glossary translation of a variant name (untranslatable chunks are dropped)."""
+    if not zh:
+        return ''
+    s = VARIANT_FILLER_RE.sub(' ', zh)
+    chunks = [t.strip() for t, _ in _variant_chunks(s) if t.strip() and t.lower() not in FILLER_WORDS]
+    # Join with separator for combos
+    result = " / ".join(dict.fromkeys(chunks))
+    return result or BRACKETS_RE.sub('', zh).strip()
+
+
+def resolve_title(zh: str) -> Optional[str]:
+    """Glossary translation of a title, or None unless no Chinese is left over.
+
+    Titles with Latin text are never resolved here: brand names and model numbers
+    need the LLM's keep/remove rules.
+    """
+    if not zh or not CHINESE_RE.search(zh) or re.search(r'[A-Za-z0-9]', zh):
+        return None
+    result = _title_pass(zh)
+    return result if result and not CHINESE_RE.search(result) else None
+
+
+def resolve_variant(zh: str) -> Optional[str]:
+    """Glossary translation of a variant name, or None unless every chunk is covered.
+
+    Unlike translate_variant_simple(), nothing is dropped: strings with filler words
+    (materials, brands) or unknown terms are left for the LLM.
+    """
+    if not zh or not CHINESE_RE.search(zh) or VARIANT_FILLER_RE.search(zh):
+        return None
+    chunks = []
+    for trans, resolved in _variant_chunks(zh):
+        if not resolved:
+            return None
+        if trans.strip():
+            chunks.append(trans.strip())
+    return " / ".join(dict.fromkeys(chunks)) or None
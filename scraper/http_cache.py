@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP cache for product image URLs (img.alicdn.com and friends).
+
+Entries are keyed by a normalized URL (https, lower-case host, query string
+dropped) and record the response body's SHA-256 together with its ETag and
+Last-Modified validators. The body itself lives in the media blob store
+(media_store.py), so an image that is also saved byte-for-byte as a product file
+is on disk once:
+
+- fresh entries (younger than max_age) are served from disk with no request
+- stale entries are revalidated with If-None-Match / If-Modified-Since; a 304
+  refreshes the entry without transferring the body again
+- the total body size is bounded; least recently used entries are evicted
+
+The index is written atomically every few updates and on close(). Blobs are
+pinned only by the index: media_store.prune(keep=cached_shas()) frees the ones
+that were evicted (or written after the last save of a crashed run) and that no
+product file links to. Bodies a cache entry points at but that were pruned are
+simply fetched again.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+import media_store
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, 'http_cache')
+INDEX_NAME = 'index.json'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB of image bodies
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # Serve without revalidating for a week
+SAVE_EVERY = 20  # Index writes are batched; close() flushes the rest
+
+
+def normalize_cache_key(url: str) -> str:
+    """Cache key for an image URL: https, lower-case host, no query/fragment."""
+    if url.startswith('//'):
+        url = 'https:' + url
+    parts = urlsplit(url)
+    return urlunsplit(('https', parts.netloc.lower(), parts.path, '', ''))
+
+
+def _load_index(index_path):
+    """Entries with a blob SHA; entries from before the blob store (no 'sha') are dropped."""
+    with open(index_path, 'r', encoding='utf-8') as f:
+        return {key: entry for key, entry in json.load(f).items() if entry.get('sha')}
+
+
+def cached_shas(cache_dir=CACHE_DIR):
+    """Blob SHAs the saved cache index refers to (pass to media_store.prune as keep)."""
+    try:
+        return {entry['sha'] for entry in _load_index(os.path.join(cache_dir, INDEX_NAME)).values()}
+    except (OSError, ValueError, AttributeError):
+        return set()
+
+
+class HttpImageCache:
+    """Disk-backed, size-bounded LRU cache with conditional revalidation."""
+
+    def __init__(self, session_factory, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self._session_factory = session_factory
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_NAME)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evictions': 0}
+        self.entries = {}
+        if os.path.exists(self.index_path):
+            try:
+                self.entries = _load_index(self.index_path)
+            except Exception as e:
+                print(f"⚠️  Could not read HTTP cache index, starting empty: {e}")
+        self._remove_legacy_bodies()
+
+    def _remove_legacy_bodies(self):
+        """Delete the per-URL body folders older versions kept next to the index."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for sub in os.listdir(self.cache_dir):
+            subdir = os.path.join(self.cache_dir, sub)
+            if os.path.isdir(subdir):
+                shutil.rmtree(subdir, ignore_errors=True)
+
+    def cached_shas(self):
+        with self._lock:
+            return {entry['sha'] for entry in self.entries.values()}
+
+    def _read_body(self, entry):
+        try:
+            with open(media_store.blob_path(entry['sha']), 'rb') as f:
+                return f.read()
+        except (OSError, KeyError):
+            return None
+
+    def fetch(self, url: str, timeout=10) -> bytes:
+        """Return the body for url, from disk when possible. Raises on HTTP errors."""
+        if url.startswith('//'):
+            url = 'https:' + url
+        key = normalize_cache_key(url)
+        with self._lock:
+            entry = dict(self.entries.get(key) or {})
+        body = self._read_body(entry) if entry else None
+        now = time.time()
+
+        if body is not None and now - entry.get('fetched_at', 0) < self.max_age:
+            self._touch(key, now)
+            self._count('hits')
+            return body
+
+        headers = {}
+        if body is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self._session_factory().get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and body is not None:
+            with self._lock:
+                if key in self.entries:
+                    self.entries[key]['fetched_at'] = now
+                    self.entries[key]['last_access'] = now
+                self._mark_dirty()
+            self._count('revalidated')
+            return body
+
+        response.raise_for_status()
+        body = response.content
+        self._store(key, body, response.headers, now)
+        self._count('misses')
+        return body
+
+    def _store(self, key, body, headers, now):
+        sha = media_store.store_bytes(body)
+        with self._lock:
+            self.entries[key] = {
+                'sha': sha,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'size': len(body),
+                'fetched_at': now,
+                'last_access': now,
+            }
+            self._evict()
+            self._mark_dirty()
+
+    def _touch(self, key, now):
+        with self._lock:
+            if key in self.entries:
+                self.entries[key]['last_access'] = now
+                self._mark_dirty()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _evict(self):
+        # Caller holds the lock
+        total = sum(e.get('size', 0) for e in self.entries.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self.entries, key=lambda k: self.entries[k].get('last_access', 0)):
+            if total <= self.max_bytes * 0.9:
+                break
+            # The blob stays until media_store.prune() finds nothing else links to it
+            total -= self.entries.pop(key).get('size', 0)
+            self.stats['evictions'] += 1
+
+    def _mark_dirty(self):
+        # Caller holds the lock
+        self._dirty += 1
+        if self._dirty >= SAVE_EVERY:
+            self._save()
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.index_path)
+        self._dirty = 0
+
+    def close(self):
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def summary(self) -> str:
+        s = self.stats
+        lookups = s['hits'] + s['revalidated'] + s['misses']
+        rate = (s['hits'] + s['revalidated']) / lookups * 100 if lookups else 0.0
+        return (f"HTTP image cache: {s['hits']} hits, {s['revalidated']} revalidated (304), "
+                f"{s['misses']} misses, {s['evictions']} evictions ({rate:.0f}% served from cache)")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Responsive WebP/AVIF derivatives of the images the shop serves.
+
+For every product folder, Main.jpg, Catalogue_XX.jpg and the stitched detail
+image (Details_Long.jpg or its --tiles segments) are resized to 320/640/1200px
+wide and encoded as WebP and AVIF into the product's Derived/ folder
+(e.g. Derived/Main-640.webp). sync-media.js copies them to shop/public/images
+as <slug>-Main-640.webp, and export_products_manifest() lists them as srcset
+candidates via load_srcsets(). Because the scraper exports the manifest before
+this runs, the srcsets of an existing products_manifest.json are refreshed too.
+
+Derived/derivatives.json records the source size/mtime and settings each output
+was made from, so re-runs only encode images that changed. Run this after
+stitch-details.py and before sync-media.js.
+
+Pillow is imported lazily, so scraper.py can use load_srcsets() without it.
+
+Usage:
+    python3 image_derivatives.py                     # All products, one process per core
+    python3 image_derivatives.py product_1_slug      # One product
+    python3 image_derivatives.py --formats webp      # Skip AVIF
+    python3 image_derivatives.py --force --jobs 2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+MEDIA_DIR = Path(__file__).resolve().parent / "media"
+MANIFEST_FILE = Path(__file__).resolve().parent.parent / "shared" / "data" / "products_manifest.json"
+DERIVED_DIR_NAME = "Derived"
+INDEX_NAME = "derivatives.json"
+WIDTHS = (320, 640, 1200)
+MAX_DIMENSION = 16383  # WebP's hard limit; also used for AVIF to stay within encoder limits
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'avif': ('AVIF', 'image/avif', {'quality': 60, 'speed': 6}),
+}
+SOURCE_PATTERNS = [
+    ("Main", "Main.jpg"),
+    ("Catalogue", "Catalogue_*.jpg"),
+    ("Details", "Details_Long.jpg"),
+    ("Details", "Details_Long_[0-9]*.jpg"),
+    ("Details", "Details_Long_[0-9]*.webp"),
+]
+
+
+def _pil():
+    """Pillow's Image and features modules, with the AVIF plugin registered when installed."""
+    from PIL import Image, features
+    try:
+        import pillow_avif  # noqa: F401 - registers the AVIF plugin on Pillow < 11.3
+    except ImportError:
+        pass
+    return Image, features
+
+
+def available_formats(requested):
+    """Requested formats this Pillow build can encode (with a warning for the rest)."""
+    _, features = _pil()
+    usable = []
+    for fmt in requested:
+        if fmt == 'avif' and not features.check('avif'):
+            print("⚠️  AVIF encoding not available (needs Pillow >= 11.3 or pillow-avif-plugin); skipping AVIF")
+            continue
+        usable.append(fmt)
+    return usable
+
+
+def source_images(product_dir: Path):
+    """Images in a product folder that get derivatives, as paths relative to the folder."""
+    sources = []
+    for subfolder, pattern in SOURCE_PATTERNS:
+        for path in sorted((product_dir / subfolder).glob(pattern)):
+            if '.tmp' not in path.name:
+                sources.append(path.relative_to(product_dir))
+    return sources
+
+
+def target_widths(width):
+    """Widths to encode for a source this wide: the standard widths below it, plus
+    its own width when it's no wider than the largest standard width. Never upscales."""
+    widths = [w for w in WIDTHS if w < width]
+    if width <= WIDTHS[-1]:
+        widths.append(width)
+    return widths
+
+
+def load_index(derived_dir: Path):
+    try:
+        with open(derived_dir / INDEX_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f).get('sources', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def write_index(derived_dir: Path, sources):
+    path = derived_dir / INDEX_NAME
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'widths': list(WIDTHS), 'sources': sources}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def encode_source(product_dir: Path, derived_dir: Path, rel_path: Path, formats):
+    """Decode one source once and write every width/format; returns the output records."""
+    Image, _ = _pil()
+    outputs = []
+    with Image.open(product_dir / rel_path) as src:
+        src_width, src_height = src.size
+        widths = target_widths(src_width)
+        # Let the JPEG decoder downscale where even the largest target is smaller
+        src.draft('RGB', (max(widths), max(widths) * src_height // src_width))
+        img = src.convert('RGB') if src.mode != 'RGB' else src.copy()
+    for width in sorted(widths, reverse=True):
+        height = max(1, round(src_height * width / src_width))
+        if height > MAX_DIMENSION:
+            print(f"      ⚠️  {rel_path.name} at {width}px is {height}px tall; too tall to encode "
+                  f"(stitch with --tiles)")
+            continue
+        resized = img if img.size == (width, height) else img.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            pil_format, _, params = FORMATS[fmt]
+            name = f"{rel_path.stem}-{width}.{fmt}"
+            tmp_path = derived_dir / f"{rel_path.stem}-{width}.tmp.{fmt}"
+            resized.save(tmp_path, pil_format, **params)
+            os.replace(tmp_path, derived_dir / name)
+            outputs.append({'file': name, 'width': width, 'format': fmt})
+        if resized is not img:
+            resized.close()
+    img.close()
+    return outputs
+
+
+def process_product(product_dir: Path, formats, force=False):
+    """Bring one product's Derived/ folder up to date. Returns (encoded, unchanged, failed) source counts.
+
+    A source that fails to encode keeps its previous derivatives and index entry.
+    """
+    sources = source_images(product_dir)
+    derived_dir = product_dir / DERIVED_DIR_NAME
+    if not sources:
+        print("  ⏭️  No images")
+        return 0, 0, 0
+    derived_dir.mkdir(exist_ok=True)
+
+    previous = load_index(derived_dir)
+    index = {}
+    encoded = unchanged = failed = 0
+    for rel_path in sources:
+        key = rel_path.as_posix()
+        stat = (product_dir / rel_path).stat()
+        signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'formats': list(formats)}
+        entry = previous.get(key)
+        if (not force and entry and all(entry.get(k) == v for k, v in signature.items())
+                and all((derived_dir / o['file']).exists() for o in entry['outputs'])):
+            index[key] = entry
+            unchanged += 1
+            continue
+        try:
+            outputs = encode_source(product_dir, derived_dir, rel_path, formats)
+        except Exception as e:
+            print(f"  ❌ {key}: {e}")
+            failed += 1
+            if entry:
+                index[key] = entry
+            continue
+        index[key] = dict(signature, outputs=outputs)
+        encoded += 1
+        print(f"  ✅ {key} → {len(outputs)} derivatives")
+
+    # Drop derivatives whose source is gone (e.g. Details_Long.jpg replaced by tiles)
+    keep = {o['file'] for entry in index.values() for o in entry['outputs']} | {INDEX_NAME}
+    for path in derived_dir.iterdir():
+        if path.is_file() and path.name not in keep:
+            path.unlink()
+    write_index(derived_dir, index)
+    if unchanged:
+        print(f"  ⏭️  {unchanged} image(s) up to date")
+    return encoded, unchanged, failed
+
+
+def load_srcsets(product_dir, media_slug):
+    """srcset candidates for a product's synced images, keyed by the original image URL.
+
+    Returns {"/images/<slug>-Main.jpg": {"image/webp": "/images/<slug>-Main-320.webp 320w, ...",
+    "image/avif": ...}, ...}; empty if image_derivatives.py hasn't run for this product.
+    """
+    srcsets = {}
+    for key, entry in load_index(Path(product_dir) / DERIVED_DIR_NAME).items():
+        by_type = {}
+        for output in sorted(entry.get('outputs', []), key=lambda o: o['width']):
+            mime_type = FORMATS[output['format']][1]
+            by_type.setdefault(mime_type, []).append(f"/images/{media_slug}-{output['file']} {output['width']}w")
+        if by_type:
+            original = f"/images/{media_slug}-{Path(key).name}"
+            srcsets[original] = {mime_type: ', '.join(c) for mime_type, c in by_type.items()}
+    return srcsets
+
+
+def refresh_manifest_srcsets(manifest_path=MANIFEST_FILE, media_dir=MEDIA_DIR):
+    """Rewrite the "srcset" of every product in products_manifest.json from Derived/ indexes."""
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return 0
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    folders = {re.sub(r'^product_\d+_', '', d.name): d for d in Path(media_dir).glob("product_*") if d.is_dir()}
+    updated = 0
+    for product in manifest.get('products', []):
+        match = re.match(r'^/images/(.+)-Main\.jpg$', (product.get('images') or [''])[0])
+        if match and match.group(1) in folders:
+            product['srcset'] = load_srcsets(folders[match.group(1)], match.group(1))
+            updated += 1
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return updated
+
+
+def _product_job(product_dir: Path, formats, force):
+    """Process-pool entry point: returns ((encoded, unchanged, failed), captured output)."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            result = process_product(product_dir, formats, force)
+        except Exception as e:
+            print(f"  ❌ Unexpected error: {e}")
+            result = None
+    return result, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate WebP/AVIF derivatives for shop images")
+    parser.add_argument('product', nargs='?', help="Specific product folder name (optional)")
+    parser.add_argument('--formats', default='webp,avif',
+                        help="Comma-separated output formats (default: webp,avif)")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Products to process in parallel (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Re-encode even if outputs are up to date")
+    args = parser.parse_args()
+
+    print("🖼️  Protocol Zero - Image Derivatives")
+    print("=" * 60)
+
+    requested = [f.strip().lower() for f in args.formats.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in FORMATS]
+    if unknown:
+        print(f"❌ Unknown format(s): {', '.join(unknown)} (choose from {', '.join(FORMATS)})")
+        return 1
+    formats = available_formats(requested)
+    if not formats:
+        print("❌ No usable output formats")
+        return 1
+
+    if not MEDIA_DIR.exists():
+        print(f"❌ Media directory not found: {MEDIA_DIR}")
+        return 1
+    if args.product:
+        product_dirs = [MEDIA_DIR / args.product]
+        if not product_dirs[0].exists():
+            print(f"❌ Product folder not found: {args.product}")
+            return 1
+    else:
+        product_dirs = sorted(f for f in MEDIA_DIR.iterdir() if f.is_dir() and f.name.startswith("product_"))
+
+    print(f"\n📦 {len(product_dirs)} product folder(s), formats: {', '.join(formats)}, widths: {list(WIDTHS)}\n")
+
+    totals = {'encoded': 0, 'unchanged': 0, 'failed_images': 0, 'failed': 0}
+
+    def _tally(result):
+        if result is None:
+            totals['failed'] += 1
+        else:
+            totals['encoded'] += result[0]
+            totals['unchanged'] += result[1]
+            totals['failed_images'] += result[2]
+
+    jobs = max(1, min(args.jobs, len(product_dirs)))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(_product_job, d, formats, args.force): d for d in product_dirs}
+            for future in as_completed(futures):
+                result, output = future.result()
+                print(f"📁 {futures[future].name}")
+                print(output, end='')
+                _tally(result)
+    else:
+        for product_dir in product_dirs:
+            print(f"📁 {product_dir.name}")
+            result, output = _product_job(product_dir, formats, args.force)
+            print(output, end='')
+            _tally(result)
+
+    print("\n" + "=" * 60)
+    print(f"✅ Encoded: {totals['encoded']} image(s)")
+    print(f"⏭️  Up to date: {totals['unchanged']} image(s)")
+    print(f"❌ Failed: {totals['failed_images']} image(s), {totals['failed']} product(s)")
+
+    updated = refresh_manifest_srcsets()
+    if updated:
+        print(f"📄 Updated srcsets for {updated} product(s) in {MANIFEST_FILE.name}")
+    return 1 if totals['failed'] or totals['failed_images'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
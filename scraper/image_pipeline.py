@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Single-pass post-processing for captured images.
+
+Downloads, browser-captured bodies and screenshots arrive as bytes. process_image()
+decodes them once, runs an ordered list of named ops and encodes the result once
+as JPEG, instead of writing the raw file and re-opening/re-encoding it for every
+step.
+
+The ops already applied are recorded in the JPEG comment ("pz-ops:aspect,margin").
+Every op is skipped when the image already has it, so running 'margin' again
+(e.g. process_file() on a capture that was padded on the way in) is a no-op that
+doesn't even re-encode the file. That is what stops the double padding and
+generation loss.
+
+Ops:
+    aspect  - reject (ImageRejected) images thinner/wider than MIN_ASPECT..MAX_ASPECT
+    quality - reject blank frames, placeholders and half-painted captures (image_quality.py)
+    blank   - reject blank frames only (for downloaded files)
+    resize  - scale down to at most MAX_WIDTH pixels wide
+    margin  - pad with MARGIN_PX of MARGIN_COLOR on every side
+
+Pillow is imported lazily, like everywhere else in the scraper.
+"""
+
+import io
+import os
+
+import image_quality
+
+MARGIN_PX = 20
+MARGIN_COLOR = (255, 255, 255)
+MAX_WIDTH = 2400
+MIN_ASPECT, MAX_ASPECT = 0.1, 10
+JPEG_QUALITY = 92
+OPS_TAG = b'pz-ops:'
+
+# Op chains used by the scraper
+# (checks run before margin, which would add a flat border of its own)
+GALLERY_OPS = ('blank', 'resize', 'margin')          # Hero/catalogue downloads
+DETAIL_OPS = ('blank',)                              # Detail downloads: checked, stored byte-for-byte
+SCREENSHOT_OPS = ('aspect', 'quality', 'margin')     # Element screenshots centred in the viewport
+AREA_SCREENSHOT_OPS = ('quality', 'margin')          # Tall elements / whole image-area screenshots
+
+
+class ImageRejected(ValueError):
+    """An op decided the image isn't usable (the caller should retry or fall back)."""
+
+
+def _aspect(img):
+    ratio = img.width / img.height
+    if not MIN_ASPECT < ratio < MAX_ASPECT:
+        raise ImageRejected(f"unusual aspect ratio {ratio:.2f}")
+    return img
+
+
+def _quality(img, full=True):
+    reason = image_quality.problem(img, check_bands=full, check_entropy=full)
+    if reason:
+        raise ImageRejected(reason)
+    return img
+
+
+def _blank(img):
+    return _quality(img, full=False)
+
+
+def _resize(img):
+    if img.width <= MAX_WIDTH:
+        return img
+    from PIL import Image
+    height = max(1, round(img.height * MAX_WIDTH / img.width))
+    return img.resize((MAX_WIDTH, height), Image.Resampling.LANCZOS)
+
+
+def _margin(img):
+    from PIL import Image
+    padded = Image.new("RGB", (img.width + MARGIN_PX * 2, img.height + MARGIN_PX * 2), MARGIN_COLOR)
+    padded.paste(img, (MARGIN_PX, MARGIN_PX))
+    return padded
+
+
+OPS = {'aspect': _aspect, 'quality': _quality, 'blank': _blank, 'resize': _resize, 'margin': _margin}
+CHECK_OPS = {'aspect', 'quality', 'blank'}  # Don't change pixels: never a reason to re-encode on their own
+
+
+def applied_ops(img):
+    """Ops recorded in an opened image's JPEG comment."""
+    comment = img.info.get('comment') or b''
+    if isinstance(comment, str):
+        comment = comment.encode('utf-8', 'replace')
+    if not comment.startswith(OPS_TAG):
+        return []
+    return [op for op in comment[len(OPS_TAG):].decode('ascii', 'replace').split(',') if op]
+
+
+def process_image(data: bytes, ops) -> bytes:
+    """Decode data once, apply the ops it doesn't have yet in order, encode once.
+
+    Returns data unchanged (same object) when every pixel-changing op was already
+    applied; remaining checks still run on the decoded header.
+    Raises ImageRejected if a check op rejects the image.
+    """
+    from PIL import Image
+    unknown = [op for op in ops if op not in OPS]
+    if unknown:
+        raise ValueError(f"Unknown image op(s): {', '.join(unknown)}")
+    with Image.open(io.BytesIO(data)) as src:
+        done = applied_ops(src)
+        todo = [op for op in ops if op not in done]
+        if all(op in CHECK_OPS for op in todo):
+            for op in todo:
+                OPS[op](src)
+            return data
+        img = src.convert("RGB") if src.mode != "RGB" else src.copy()
+    for op in todo:
+        img = OPS[op](img)
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=JPEG_QUALITY, comment=OPS_TAG + ','.join(done + todo).encode('ascii'))
+    img.close()
+    return out.getvalue()
+
+
+def write_image(data: bytes, path: str, ops=()) -> bool:
+    """Process data and write it to path atomically (path may be a hardlink into the blob store)."""
+    if ops:
+        data = process_image(data, ops)
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{ext}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def process_file(path: str, ops) -> bool:
+    """Apply ops to an image file in place; returns False if it already had them (file untouched)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    processed = process_image(data, ops)
+    if processed is data:
+        return False
+    write_image(processed, path)
+    return True
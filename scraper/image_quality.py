@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Fast quality gate for captured images.
+
+Blank placeholder screenshots, lazy-load spinners and half-painted captures used
+to pass the byte-size checks and were only caught during the manual review
+pause. problem() looks at a small grayscale copy (at most SAMPLE_SIZE px on a
+side) with NumPy and returns why an image is unusable, or None:
+
+- blank: almost no variation (standard deviation below BLANK_STD)
+- placeholder: very low histogram entropy, e.g. a spinner or logo on a flat page
+- partial render: a flat, near-white band covering BAND_FRACTION of the image
+  from the bottom or right edge (where lazy-load cut-offs appear), while the
+  opposite edge has real content and a different level. A product shot on a
+  white background has flat white on both sides; an image that stopped
+  painting halfway doesn't.
+
+image_pipeline exposes this as the 'quality' check op (everything, for
+screenshots) and the 'blank' op (only the std check, for downloads: a sparse
+text/spec image on white has very low entropy but is real content).
+Without NumPy the gate is skipped (with a one-time warning) rather than failing
+the capture.
+"""
+
+SAMPLE_SIZE = 128
+BLANK_STD = 4.0          # Gray levels
+MIN_ENTROPY = 0.5        # Bits
+FLAT_LINE_STD = 2.0      # A row/column this uniform counts as "flat"
+BAND_FRACTION = 0.3      # Flat band covering this much of the image from the bottom/right edge...
+BAND_MIN_LEVEL = 230.0   # ...that is near white (the unpainted page)...
+BAND_CONTRAST = 25.0     # ...at least this far from the opposite edge's level...
+OPPOSITE_MAX_FLAT = 0.05 # ...whose own flat run from that edge is at most this fraction
+PARTIAL_EDGES = ('bottom', 'right')
+
+_warned = False
+
+
+def _sample(img):
+    """Grayscale float array of img, reduced to at most ~SAMPLE_SIZE px on its short side."""
+    import numpy as np
+    if img.mode not in ('L', 'RGB'):
+        img = img.convert('RGB')
+    factor = max(1, min(img.size) // SAMPLE_SIZE)
+    small = img.reduce(factor) if factor > 1 else img
+    return np.asarray(small.convert('L'), dtype=np.float32)
+
+
+def _entropy(arr):
+    import numpy as np
+    counts = np.bincount(arr.astype(np.uint8).ravel(), minlength=256)
+    p = counts[counts > 0] / arr.size
+    return float(-(p * np.log2(p)).sum())
+
+
+def _flat_run(line_std):
+    """Number of consecutive flat lines from the start of line_std."""
+    import numpy as np
+    not_flat = np.flatnonzero(line_std >= FLAT_LINE_STD)
+    return int(not_flat[0]) if not_flat.size else len(line_std)
+
+
+def measure(img):
+    """Quality metrics for a PIL image: std, entropy and the flat band along each edge.
+
+    bands maps each edge to {'fraction', 'level', 'contrast', 'opposite_flat'}: how
+    much of the image the flat run from that edge covers, its gray level, the
+    difference to the opposite edge's level, and the opposite edge's own flat run.
+    """
+    arr = _sample(img)
+    row_std, col_std = arr.std(axis=1), arr.std(axis=0)
+    runs = {
+        'top': _flat_run(row_std), 'bottom': _flat_run(row_std[::-1]),
+        'left': _flat_run(col_std), 'right': _flat_run(col_std[::-1]),
+    }
+    edges = {
+        # edge: (opposite edge, length of that axis, band level, opposite edge level)
+        'top': ('bottom', arr.shape[0], arr[0].mean(), arr[-1].mean()),
+        'bottom': ('top', arr.shape[0], arr[-1].mean(), arr[0].mean()),
+        'left': ('right', arr.shape[1], arr[:, 0].mean(), arr[:, -1].mean()),
+        'right': ('left', arr.shape[1], arr[:, -1].mean(), arr[:, 0].mean()),
+    }
+    return {
+        'std': float(arr.std()),
+        'entropy': _entropy(arr),
+        'bands': {edge: {'fraction': runs[edge] / length,
+                         'level': float(level),
+                         'contrast': abs(float(level - opposite_level)),
+                         'opposite_flat': runs[opposite] / length}
+                  for edge, (opposite, length, level, opposite_level) in edges.items()},
+    }
+
+
+def problem(img, check_bands=True, check_entropy=True):
+    """Why img looks like a bad capture, or None if it passes (or NumPy isn't installed).
+
+    check_bands and check_entropy only make sense for screenshots: downloaded
+    files are complete, detail images often have large white areas on one side,
+    and a few lines of text on white score below MIN_ENTROPY.
+    """
+    global _warned
+    try:
+        metrics = measure(img)
+    except ImportError:
+        if not _warned:
+            print("      -> ⚠️  NumPy not installed, skipping image quality checks")
+            _warned = True
+        return None
+    if metrics['std'] < BLANK_STD:
+        return f"blank frame (std {metrics['std']:.1f})"
+    if check_entropy and metrics['entropy'] < MIN_ENTROPY:
+        return f"looks like a placeholder (entropy {metrics['entropy']:.2f} bits)"
+    if not check_bands:
+        return None
+    for edge in PARTIAL_EDGES:
+        band = metrics['bands'][edge]
+        if (band['fraction'] >= BAND_FRACTION and band['level'] >= BAND_MIN_LEVEL
+                and band['contrast'] >= BAND_CONTRAST and band['opposite_flat'] <= OPPOSITE_MAX_FLAT):
+            return f"partially rendered ({band['fraction']:.0%} flat band at the {edge})"
+    return None
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Identity of image URLs across alicdn's size and format variants.
+
+Taobao pages reference one picture under many URLs: the gallery thumbnail
+(...jpg_60x60q90.jpg), the main view (...jpg_460x460q90.jpg_.webp), lazy-load
+attributes with or without a protocol, and img./gw. hosts for the same path.
+url_key() maps all of them to one key, and SeenUrls is a set of those keys, so
+the scraper recognises a picture it already has before downloading or
+screenshotting it again.
+
+canonical_url() points at the original upload instead of the thumbnail the page
+displays, and candidate_urls() is the ladder download_image() walks: the
+original first, then large renditions alicdn generates on demand, then the URL
+as found on the page.
+"""
+
+import re
+from urllib.parse import urlsplit
+
+ALICDN_HOST_RE = re.compile(r'(^|\.)alicdn\.com$', re.IGNORECASE)
+# The original file name's extension followed by one or more resize/format suffixes:
+# "_60x60q90.jpg", "_q50.jpg", "_Q75.jpg", "_sum.jpg", "_.webp", ...
+ALICDN_SUFFIX_RE = re.compile(r'(\.(?:jpe?g|png|gif|webp))((?:_[^/_.]*\.(?:jpe?g|png|gif|webp))+)$', re.IGNORECASE)
+# Renditions to try, largest first, when the original can't be fetched or fails the checks
+FALLBACK_SIZES = ('1200x1200', '800x800', '640x640')
+
+
+def strip_alicdn_suffix(path: str) -> str:
+    """Path of the original asset: alicdn resize/format suffixes removed."""
+    return ALICDN_SUFFIX_RE.sub(r'\1', path)
+
+
+def _https(url: str) -> str:
+    return 'https:' + url if url.startswith('//') else url
+
+
+def canonical_url(url: str) -> str:
+    """URL of the original asset for an alicdn image (https, no suffixes or query); others unchanged."""
+    url = _https(url)
+    if not url.startswith(('http://', 'https://')):
+        return url
+    parts = urlsplit(url)
+    if not ALICDN_HOST_RE.search(parts.hostname or ''):
+        return url
+    return f"https://{parts.netloc.lower()}{strip_alicdn_suffix(parts.path)}"
+
+
+def is_original(url: str) -> bool:
+    """Whether url already points at the original asset (so nothing better can be fetched)."""
+    return canonical_url(url) == _https(url).split('?', 1)[0]
+
+
+def candidate_urls(url: str):
+    """Download ladder for url: original, FALLBACK_SIZES renditions, then url itself (deduplicated)."""
+    original = canonical_url(url)
+    candidates = [original]
+    if original != _https(url):
+        candidates += [f"{original}_{size}q90.jpg" for size in FALLBACK_SIZES]
+    candidates.append(_https(url))
+    return list(dict.fromkeys(candidates))
+
+
+def url_key(url: str) -> str:
+    """Key that is equal for every size/format/host variant of the same image.
+
+    Non-URLs (e.g. the scraper's "hero_0" markers) are returned unchanged.
+    """
+    url = _https(url)
+    if not url.startswith(('http://', 'https://')):
+        return url
+    parts = urlsplit(url)
+    if ALICDN_HOST_RE.search(parts.hostname or ''):
+        return 'alicdn:' + strip_alicdn_suffix(parts.path)
+    return f"{(parts.hostname or '').lower()}{parts.path}"
+
+
+class SeenUrls:
+    """A set of images by url_key(): 'url in seen' matches any variant of an added URL."""
+
+    def __init__(self):
+        self._keys = set()
+
+    def add(self, url: str):
+        self._keys.add(url_key(url))
+
+    def __contains__(self, url: str) -> bool:
+        return url_key(url) in self._keys
+
+    def __len__(self):
+        return len(self._keys)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Content-addressed blob store for scraped media.
+
+Every image lives once under media/.blobs/<aa>/<sha256>.<ext>; the per-product
+Main/, Catalogue/ and Details/ files are hardlinks to those blobs, so the same
+picture scraped under two product slugs costs disk space once. Avoiding repeat
+downloads of the same URL is http_cache.py's job.
+
+A blob whose link count has dropped to 1 is only referenced by the store itself:
+its product files were deleted during review, dropped as duplicates or replaced
+by a re-scrape. prune() deletes those, except the ones the HTTP cache
+(http_cache.py) keeps its response bodies in; the scraper runs it at the end of
+a scrape and stitch-details.py after the manual review.
+
+Product files are shared inodes: anything that rewrites one in place must call
+detach() first (or write to a temp file and os.replace it), otherwise the blob
+and every other product linked to it would change too.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BLOB_DIR = os.path.join(SCRIPT_DIR, 'media', '.blobs')
+
+_lock = threading.Lock()
+
+
+def blob_path(sha: str, ext: str = '.jpg') -> str:
+    return os.path.join(BLOB_DIR, sha[:2], f"{sha}{ext}")
+
+
+def _ext(path: str) -> str:
+    return os.path.splitext(path)[1].lower() or '.jpg'
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def detach(path: str):
+    """Remove a product file that may be a hardlink to a blob before it is rewritten."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def link_blob(blob: str, target: str):
+    """Point target at blob via a hardlink (copy if the filesystem can't link)."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.link-tmp"
+    detach(tmp)
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, target)
+
+
+def store_bytes(data: bytes, ext: str = '.jpg') -> str:
+    """Write data into the store (if new) and return its SHA-256."""
+    sha = hashlib.sha256(data).hexdigest()
+    blob = blob_path(sha, ext)
+    if not os.path.exists(blob):
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp = f"{blob}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, blob)
+    return sha
+
+
+def prune(keep=()):
+    """Delete blobs no product file links to any more (st_nlink == 1).
+
+    SHAs in keep are left alone. Returns (blobs removed, bytes freed). On
+    filesystems without hardlinks products hold copies, so pruning only loses
+    the deduplication there, never a product image.
+    """
+    keep = set(keep)
+    removed = freed = 0
+    if not os.path.isdir(BLOB_DIR):
+        return removed, freed
+    with _lock:
+        for sub in os.listdir(BLOB_DIR):
+            subdir = os.path.join(BLOB_DIR, sub)
+            if not os.path.isdir(subdir):
+                continue
+            for name in os.listdir(subdir):
+                path = os.path.join(subdir, name)
+                if '.tmp' in name or name.split('.', 1)[0] in keep:
+                    continue
+                try:
+                    stat = os.stat(path)
+                    if stat.st_nlink == 1:
+                        os.remove(path)
+                        removed += 1
+                        freed += stat.st_size
+                except OSError:
+                    pass
+    return removed, freed
+
+
+def ingest_file(path: str):
+    """Move a finished product file into the store and leave a hardlink in its place.
+
+    Returns (sha, deduplicated) where deduplicated is True if an identical blob
+    already existed and the file was replaced by a link to it.
+    """
+    sha = _hash_file(path)
+    blob = blob_path(sha, _ext(path))
+    with _lock:
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            try:
+                os.link(path, blob)
+            except OSError:
+                shutil.copyfile(path, blob)
+            return sha, False
+        if os.path.samefile(path, blob):
+            return sha, False
+    link_blob(blob, path)
+    return sha, True
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Network-level image capture through the Chrome DevTools Protocol.
+
+With Chrome's performance log enabled (enable_performance_log), every image
+response the page receives while it loads and scrolls is recorded with its URL,
+MIME type, status and transferred size. Bodies are then read back from the
+browser with Network.getResponseBody, so images Chrome already downloaded are
+saved without a second HTTP request.
+
+Only original assets are read back: for resized renditions the scraper downloads
+the original instead (image_urls.candidate_urls), so their browser copy would be
+thrown away.
+
+Only the browser thread may call poll()/body(): they talk to the driver.
+record_served() may be called from download threads.
+"""
+
+import base64
+import json
+import threading
+
+from http_cache import normalize_cache_key
+from image_urls import is_original
+
+
+def enable_performance_log(options):
+    """Turn on the performance log that NetworkImageCapture reads (ChromeOptions)."""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+class NetworkImageCapture:
+    """Image responses seen by one product page, keyed like the HTTP cache."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.responses = {}
+        self._by_request = {}
+        self.stats = {'served': 0, 'missed': 0, 'renditions': 0}
+        self._stats_lock = threading.Lock()
+        try:
+            # Drain whatever the previous page left in the log
+            driver.get_log('performance')
+            self.enabled = True
+        except Exception:
+            self.enabled = False
+
+    def poll(self):
+        """Consume new performance log entries and record image responses."""
+        if not self.enabled:
+            return
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            return
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                mime_type = response.get('mimeType', '')
+                if params.get('type') != 'Image' and not mime_type.startswith('image/'):
+                    continue
+                url = response.get('url', '')
+                if not url.startswith('http'):
+                    continue
+                record = {
+                    'url': url,
+                    'request_id': params.get('requestId'),
+                    'mime_type': mime_type,
+                    'status': response.get('status'),
+                    'size': response.get('encodedDataLength', 0),
+                    'finished': False,
+                }
+                self.responses[normalize_cache_key(url)] = record
+                self._by_request[record['request_id']] = record
+            elif method == 'Network.loadingFinished':
+                record = self._by_request.get(params.get('requestId'))
+                if record is not None:
+                    record['size'] = params.get('encodedDataLength', record['size'])
+                    record['finished'] = True
+            elif method == 'Network.loadingFailed':
+                record = self._by_request.pop(params.get('requestId'), None)
+                if record is not None:
+                    self.responses.pop(normalize_cache_key(record['url']), None)
+
+    def lookup(self, url):
+        """Captured response record for url, or None."""
+        self.poll()
+        if url.startswith('//'):
+            url = 'https:' + url
+        return self.responses.get(normalize_cache_key(url))
+
+    def body(self, url):
+        """Response body for url straight from the browser, or None if it isn't available.
+
+        Renditions (not is_original) return None without a CDP round-trip.
+        """
+        if not self.enabled:
+            return None
+        if not is_original(url):
+            self.stats['renditions'] += 1
+            return None
+        record = self.lookup(url)
+        if record is None or not record['finished'] or record['status'] != 200:
+            self.stats['missed'] += 1
+            return None
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': record['request_id']})
+        except Exception:
+            # Chrome only keeps recent bodies in its buffer
+            self.stats['missed'] += 1
+            return None
+        data = result.get('body', '')
+        return base64.b64decode(data) if result.get('base64Encoded') else data.encode('latin-1')
+
+    def record_served(self):
+        """Count a body that was actually written to disk."""
+        with self._stats_lock:
+            self.stats['served'] += 1
+
+    def image_urls(self, min_bytes=0):
+        """URLs of finished image responses of at least min_bytes, in load order."""
+        self.poll()
+        return [r['url'] for r in self.responses.values() if r['finished'] and r['size'] >= min_bytes]
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Perceptual hashes and the index of detail images operators keep deleting.
+
+Shop banners, coupons and size charts recur across products from the same
+seller, and operators delete them from Details/ by hand before stitching. This
+module remembers those deletions:
+
+1. When a product is scraped, finalize_pending_media() records every kept
+   Detail_XX.jpg with its SHA-256 and perceptual hashes in Details/.captured.json.
+2. stitch-details.py runs after the manual review. learn_deletions() compares
+   .captured.json with what is left in Details/ and adds the missing images to
+   media/.unwanted_images.json.
+3. On later scrapes, new detail captures are hashed and compared with the index.
+   Near-duplicates are dropped before they reach Details/. The index spans every
+   product, so it uses the stricter UNWANTED_* thresholds: a look-alike layout
+   in another product must not be mistaken for the deleted banner.
+
+dHash and pHash only see luminance, so the same shot in two colourways hashes
+almost identically. The colour signature (mean RGB of a COLOR_GRID x COLOR_GRID
+grid) must also be within COLOR_MAX_DISTANCE levels in every cell, which keeps
+per-colour gallery images apart.
+
+BKTree gives sub-linear near-neighbour lookups over dHashes. The unwanted index
+uses one, and so does finalize_pending_media() to drop near-duplicates within a
+product's Main/Catalogue/Details captures.
+
+dHash needs only Pillow. pHash (a 32x32 DCT) needs NumPy and is skipped without it.
+
+Usage:
+    python3 perceptual_hash.py                # Learn from every product folder, show index size
+    python3 perceptual_hash.py --forget SHA   # Remove an image from the index
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MEDIA_DIR = os.path.join(SCRIPT_DIR, 'media')
+INDEX_FILE = os.path.join(MEDIA_DIR, '.unwanted_images.json')
+CAPTURED_NAME = '.captured.json'
+DHASH_MAX_DISTANCE = 6   # Bits out of 64
+PHASH_MAX_DISTANCE = 10  # Bits out of 64
+COLOR_GRID = 4
+COLOR_MAX_DISTANCE = 24  # Largest per-channel difference of any grid cell's mean, in levels
+# Stricter thresholds for the cross-product unwanted index
+UNWANTED_THRESHOLDS = {'dhash_max': 3, 'phash_max': 6, 'color_max': 12}
+
+
+def dhash(img, size=8) -> int:
+    """Difference hash: compares horizontally adjacent pixels of a (size+1)x size thumbnail."""
+    from PIL import Image
+    small = img.convert('L').resize((size + 1, size), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def phash(img, size=32, keep=8):
+    """DCT hash: low-frequency 8x8 DCT coefficients of a 32x32 thumbnail vs their median.
+
+    Returns None when NumPy isn't installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    from PIL import Image
+    small = img.convert('L').resize((size, size), Image.Resampling.LANCZOS)
+    pixels = np.asarray(small, dtype=np.float64)
+    k = np.arange(size)
+    dct = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * size))
+    low = (dct @ pixels @ dct.T)[:keep, :keep].ravel()
+    bits = 0
+    for above in low > np.median(low[1:]):
+        bits = (bits << 1) | bool(above)
+    return bits
+
+
+def color_signature(img, grid=COLOR_GRID) -> bytes:
+    """Mean R, G, B of each cell of a grid x grid split of the image."""
+    from PIL import Image
+    return img.convert('RGB').resize((grid, grid), Image.Resampling.BOX).tobytes()
+
+
+def hash_file(path):
+    """{'dhash': hex, 'phash': hex or None, 'color': hex} for an image file."""
+    from PIL import Image
+    with Image.open(path) as img:
+        img.draft('RGB', (128, 128))  # Hashes only need a thumbnail
+        p = phash(img)
+        return {'dhash': f"{dhash(img):016x}", 'phash': f"{p:016x}" if p is not None else None,
+                'color': color_signature(img).hex()}
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def color_distance(a: str, b: str) -> int:
+    """Largest per-channel difference between two colour signatures (hex)."""
+    a, b = bytes.fromhex(a), bytes.fromhex(b)
+    if len(a) != len(b):
+        return 255
+    return max((abs(x - y) for x, y in zip(a, b)), default=0)
+
+
+def is_near_duplicate(a, b, dhash_max=DHASH_MAX_DISTANCE, phash_max=PHASH_MAX_DISTANCE,
+                      color_max=COLOR_MAX_DISTANCE) -> bool:
+    """Whether two hash dicts (see hash_file) describe the same picture.
+
+    Hashes without a colour signature (recorded before it existed) never match.
+    """
+    if hamming(int(a['dhash'], 16), int(b['dhash'], 16)) > dhash_max:
+        return False
+    if a.get('phash') and b.get('phash') and hamming(int(a['phash'], 16), int(b['phash'], 16)) > phash_max:
+        return False
+    if not (a.get('color') and b.get('color')):
+        return False
+    return color_distance(a['color'], b['color']) <= color_max
+
+
+class BKTree:
+    """Burkhard-Keller tree of hash dicts keyed by dHash, searched by Hamming distance.
+
+    Children are keyed by their distance to the parent, so a search only descends
+    into subtrees that can hold a match (triangle inequality).
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def add(self, hashes, item):
+        node = (int(hashes['dhash'], 16), hashes, item, {})
+        self._size += 1
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            distance = hamming(node[0], current[0])
+            child = current[3].get(distance)
+            if child is None:
+                current[3][distance] = node
+                return
+            current = child
+
+    def search(self, hashes, max_distance=DHASH_MAX_DISTANCE):
+        """(hashes, item) pairs whose dHash is within max_distance bits."""
+        if self._root is None:
+            return []
+        key = int(hashes['dhash'], 16)
+        found, stack = [], [self._root]
+        while stack:
+            node_key, node_hashes, item, children = stack.pop()
+            distance = hamming(key, node_key)
+            if distance <= max_distance:
+                found.append((node_hashes, item))
+            stack.extend(child for d, child in children.items()
+                         if distance - max_distance <= d <= distance + max_distance)
+        return found
+
+    def find_near_duplicate(self, hashes, **thresholds):
+        """Item of the first entry that is_near_duplicate() of hashes, or None.
+
+        thresholds are passed on to is_near_duplicate().
+        """
+        max_distance = thresholds.get('dhash_max', DHASH_MAX_DISTANCE)
+        for candidate, item in self.search(hashes, max_distance):
+            if is_near_duplicate(hashes, candidate, **thresholds):
+                return item
+        return None
+
+    def __len__(self):
+        return self._size
+
+
+class UnwantedIndex:
+    """Hashes of images operators deleted, keyed by SHA-256 (media/.unwanted_images.json)."""
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.images = {}
+        self._tree = BKTree()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.images = json.load(f).get('images', {})
+        except (OSError, ValueError):
+            pass
+        for sha, entry in self.images.items():
+            self._tree.add(entry, sha)
+
+    def match(self, hashes):
+        """(sha, entry) of the unwanted image hashes is a near-duplicate of, or None."""
+        sha = self._tree.find_near_duplicate(hashes, **UNWANTED_THRESHOLDS)
+        return (sha, self.images[sha]) if sha in self.images else None
+
+    def add(self, sha, hashes, source):
+        """Remember an unwanted image; returns False if it was already known."""
+        if sha in self.images:
+            return False
+        self.images[sha] = dict(hashes, source=source, added=int(time.time()))
+        self._tree.add(self.images[sha], sha)
+        return True
+
+    def forget(self, sha):
+        # Only the saved file changes; BK-trees don't support removal, and the CLI exits right after
+        return self.images.pop(sha, None) is not None
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'images': self.images}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        return len(self.images)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def unwanted_index():
+    """The index as of the start of this run, loaded once and shared by scraper threads."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = UnwantedIndex()
+        return _index
+
+
+def record_captured(details_dir, captured):
+    """Write Details/.captured.json: {filename: {'sha', 'dhash', 'phash', 'color'}} for kept captures."""
+    path = os.path.join(details_dir, CAPTURED_NAME)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(captured, f, indent=2)
+    os.replace(tmp, path)
+
+
+def learn_deletions(details_dir, index):
+    """Add captured detail images that are no longer in details_dir to index; returns how many."""
+    try:
+        with open(os.path.join(details_dir, CAPTURED_NAME), 'r', encoding='utf-8') as f:
+            captured = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    product = os.path.basename(os.path.dirname(os.path.abspath(details_dir)))
+    learned = 0
+    for filename, entry in captured.items():
+        if os.path.exists(os.path.join(details_dir, filename)) or not entry.get('dhash'):
+            continue
+        hashes = {'dhash': entry['dhash'], 'phash': entry.get('phash'), 'color': entry.get('color')}
+        if index.add(entry['sha'], hashes, f"{product}/{filename}"):
+            learned += 1
+    return learned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn which detail images operators delete")
+    parser.add_argument('--forget', metavar='SHA', help="Remove an image from the unwanted index")
+    args = parser.parse_args()
+
+    index = UnwantedIndex()
+    if args.forget:
+        if index.forget(args.forget):
+            index.save()
+            print(f"✅ Forgot {args.forget}")
+        else:
+            print(f"❌ Not in the index: {args.forget}")
+        return
+
+    learned = 0
+    if os.path.isdir(MEDIA_DIR):
+        for name in sorted(os.listdir(MEDIA_DIR)):
+            if name.startswith('product_'):
+                learned += learn_deletions(os.path.join(MEDIA_DIR, name, 'Details'), index)
+    if learned:
+        index.save()
+    print(f"🧠 Learned {learned} unwanted image(s); index has {len(index)} ({INDEX_FILE})")
+
+
+if __name__ == "__main__":
+    main()
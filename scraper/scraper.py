@@ -3,8 +3,14 @@ import time
 import os
 import re
 import requests
+import shutil
 import subprocess
 import sys
+import queue
+import threading
+import hashlib
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -14,6 +20,14 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 # LLM translation will be added via OpenAI API
 import json
 from typing import List, Dict
+import media_store
+import image_pipeline
+import perceptual_hash
+import image_urls
+from image_urls import SeenUrls
+from http_cache import HttpImageCache
+from network_capture import NetworkImageCapture, enable_performance_log
+from image_derivatives import load_srcsets
 
 ## --- Removed all OCR and price extraction logic ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -22,7 +36,20 @@ CSV_OUTPUT_FILE = os.path.join(SCRIPT_DIR, 'protocol_zero_variants.csv')
 MEDIA_DIR = os.path.join(SCRIPT_DIR, 'media')
 SCREENSHOTS_DIR = os.path.join(SCRIPT_DIR, 'screenshots')
 SELENIUM_PROFILE_DIR = os.path.join(SCRIPT_DIR, 'chrome_profile_selenium')
+WORKER_PROFILES_DIR = os.path.join(SCRIPT_DIR, 'chrome_profile_workers')
 SHARED_DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'shared', 'data')
+SCRAPE_QUEUE_FILE = os.path.join(SHARED_DATA_DIR, 'scrape_queue.json')
+CATALOG_INDEX_FILE = os.path.join(SHARED_DATA_DIR, 'catalog_index.json')
+INCREMENTAL_TTL_HOURS = 24  # --incremental skips products scraped more recently than this
+DOWNLOAD_WORKERS = 8  # Background image downloads per product
+MAX_SCRAPE_ATTEMPTS = 3  # Failed URLs are retried on later runs up to this many times
+READY_TIMEOUT = 5  # Ceiling (seconds) for any single page-readiness wait
+# --variants-only: requests Chrome never makes (images, media, fonts), via CDP Network.setBlockedURLs
+FAST_MODE_BLOCKED_URLS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.m3u8', '*.flv', '*.mov',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+]
 
 # --- REAL SELECTORS (FROM YOUR HTML) ---
 TITLE_SELECTOR = 'span.mainTitle--R75fTcZL'
@@ -36,6 +63,25 @@ DETAIL_SECTION_SELECTOR = 'div[class*="description"], div[class*="detail"]'  # D
 DETAIL_IMAGES_SELECTOR = 'img[src*="desc"], img[src*="detail"]'  # Detail images in description
 # --- End Configuration ---
 
+CSV_FIELDNAMES = [
+    'URL',  # Base product URL
+    'Product Title',  # Chinese product name (stays in Chinese - Comet will translate)
+    'Product Title ZH',  # Chinese product name
+    'Option Name',  # Chinese variant name (stays in Chinese - Comet will translate)
+    'Option Name ZH',  # Chinese variant name
+    'Variant URL',  # Variant-specific purchase URL (captured when variant is clicked)
+    'Price',
+    'Price CNY',
+    'Price CAD',
+    'Shipping CAD',
+    'Final CAD',
+    'Media Folder',
+    'Main Images',
+    'Detail Images',
+    'Catalogue Images'
+]
+NUMERIC_CSV_COLUMNS = ['Price CNY', 'Price CAD', 'Shipping CAD', 'Final CAD', 'Main Images', 'Detail Images', 'Catalogue Images']
+
 ## --- Currency conversion and shipping removed; prices will be manually input ---
 
 # --- LLM Translation Configuration ---
@@ -56,6 +102,130 @@ def scroll_page_to_top(driver):
     except Exception:
         pass
 
+# --- Readiness waits (replace fixed sleeps; each has a timeout ceiling) ---
+
+IMAGE_READY_JS = """
+var img = arguments[0];
+var src = img.currentSrc || img.src || '';
+return !!src && src.indexOf('data:') !== 0 && img.complete && img.naturalWidth > 0;
+"""
+
+MAIN_IMAGE_STATE_JS = """
+var area = document.querySelector(arguments[0]);
+if (!area) return null;
+var img = area.querySelector(arguments[1]) || area.querySelector('img');
+if (!img) return null;
+return {src: img.currentSrc || img.src || '', ready: img.complete && img.naturalWidth > 0};
+"""
+
+# Resolves once the DOM has had no mutations for quietMs, or after timeoutMs
+DOM_SETTLE_JS = """
+var quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var finished = false, quiet = null, ceiling = null, observer = null;
+function finish() {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(quiet);
+    clearTimeout(ceiling);
+    done(true);
+}
+observer = new MutationObserver(function() {
+    clearTimeout(quiet);
+    quiet = setTimeout(finish, quietMs);
+});
+observer.observe(document.body, {childList: true, subtree: true, attributes: true,
+                                 attributeFilter: ['src', 'data-src', 'style', 'class']});
+quiet = setTimeout(finish, quietMs);
+ceiling = setTimeout(finish, timeoutMs);
+"""
+
+PENDING_VIEWPORT_IMAGES_JS = """
+var pending = 0;
+var imgs = document.images;
+for (var i = 0; i < imgs.length; i++) {
+    var r = imgs[i].getBoundingClientRect();
+    if (r.bottom < 0 || r.top > window.innerHeight || r.width === 0) continue;
+    if (!imgs[i].complete) pending++;
+}
+return pending;
+"""
+
+# Two animation frames after a scroll: layout and paint have caught up.
+# rAF is paused in occluded/background windows, so the ceiling (ms) always ends the wait.
+SCROLL_SETTLED_JS = """
+var timeoutMs = arguments[0];
+var done = arguments[arguments.length - 1];
+var finished = false;
+function finish(settled) {
+    if (finished) return;
+    finished = true;
+    done(settled);
+}
+setTimeout(function() { finish(false); }, timeoutMs);
+requestAnimationFrame(function() { requestAnimationFrame(function() { finish(true); }); });
+"""
+
+def _wait_until(driver, condition, timeout=READY_TIMEOUT, poll=0.1):
+    """WebDriverWait that returns False on timeout or a stale element instead of raising."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+        return True
+    except Exception:
+        return False
+
+def wait_for_image_ready(driver, img_element, timeout=READY_TIMEOUT):
+    """Wait until an <img> has a real (non data:) source that has finished loading."""
+    return _wait_until(driver, lambda d: d.execute_script(IMAGE_READY_JS, img_element), timeout)
+
+def get_main_image_src(driver) -> str:
+    try:
+        state = driver.execute_script(MAIN_IMAGE_STATE_JS, PRODUCT_IMAGE_AREA_SELECTOR, MAIN_IMAGE_SELECTOR)
+        return (state or {}).get('src', '')
+    except Exception:
+        return ''
+
+def wait_for_main_image(driver, previous_src='', thumb_src='', timeout=READY_TIMEOUT):
+    """After a thumbnail click, wait for the main display image to switch and finish loading.
+
+    The switch counts as done when the src changed, or when the main image
+    already shows the clicked thumbnail's picture (same image_urls.url_key).
+    """
+    thumb_key = image_urls.url_key(thumb_src) if thumb_src else ''
+
+    def _switched(d):
+        state = d.execute_script(MAIN_IMAGE_STATE_JS, PRODUCT_IMAGE_AREA_SELECTOR, MAIN_IMAGE_SELECTOR)
+        if not state or not state.get('ready'):
+            return False
+        src = state.get('src', '')
+        return src != previous_src or bool(thumb_key and image_urls.url_key(src) == thumb_key)
+
+    return _wait_until(driver, _switched, timeout)
+
+def wait_for_variant_applied(driver, button, previous_url, previous_class, timeout=2):
+    """After a variant click, wait for the URL (skuId) or the button's selected state to change."""
+    return _wait_until(
+        driver,
+        lambda d: d.current_url != previous_url or (button.get_attribute('class') or '') != previous_class,
+        timeout,
+        poll=0.05,
+    )
+
+def wait_for_lazy_content(driver, quiet_ms=300, timeout=3):
+    """Wait for lazy-loading to settle: DOM quiet (MutationObserver), then viewport images complete."""
+    try:
+        driver.execute_async_script(DOM_SETTLE_JS, quiet_ms, int(timeout * 1000))
+    except Exception:
+        pass
+    _wait_until(driver, lambda d: d.execute_script(PENDING_VIEWPORT_IMAGES_JS) == 0, timeout)
+
+def wait_for_scroll_settled(driver, timeout=0.5):
+    """Wait two animation frames after a scroll, at most timeout seconds."""
+    try:
+        driver.execute_async_script(SCROLL_SETTLED_JS, int(timeout * 1000))
+    except Exception:
+        pass
+
 def apply_media_counts(row: Dict, media_files: List[Dict]):
     """Populate media count fields for a scraped variant row."""
     main_count = sum(1 for m in media_files if m.get('type') == 'Main')
@@ -129,40 +299,255 @@ def get_product_title(driver):
     except Exception:
         return ''
 
-def download_image(url, save_path):
-    """Download image from URL to save_path"""
+_http_session = None
+_http_session_lock = threading.Lock()
+_http_pool_size = DOWNLOAD_WORKERS
+
+def size_http_pool(products_at_once):
+    """Size the shared session's per-host pool for this many products downloading in parallel.
+
+    Every product has its own MediaDownloadQueue of DOWNLOAD_WORKERS threads; a
+    smaller pool makes urllib3 open and discard connections beyond it.
+    """
+    global _http_session, _http_pool_size
+    with _http_session_lock:
+        size = DOWNLOAD_WORKERS * max(1, products_at_once)
+        if size != _http_pool_size:
+            _http_pool_size = size
+            if _http_session is not None:
+                _http_session.close()
+                _http_session = None  # Rebuilt with the new pool size on next use
+
+def get_http_session():
+    """Shared keep-alive session; connections are pooled per host (img.alicdn.com, gw.alicdn.com, ...)."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=_http_pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            _http_session = session
+        return _http_session
+
+# Persistent, revalidating cache for image URLs (see http_cache.py)
+IMAGE_CACHE = HttpImageCache(get_http_session)
+
+def save_image_bytes(content, save_path, min_bytes=0, ops=(), label='Saved'):
+    """Store image bytes as save_path via the blob store, running image_pipeline ops first.
+
+    The bytes are decoded and encoded at most once; with no ops they are stored as-is.
+    """
+    if len(content) <= min_bytes:
+        print(f"      -> Too small ({len(content)} bytes): {os.path.basename(save_path)}")
+        return False
+    if ops:
+        try:
+            content = image_pipeline.process_image(content, ops)
+        except image_pipeline.ImageRejected as e:
+            print(f"      -> Rejected {os.path.basename(save_path)}: {e}")
+            return False
+        except Exception as e:
+            print(f"      -> Failed to process {os.path.basename(save_path)}, keeping original: {e}")
+    sha = media_store.store_bytes(content)
+    media_store.link_blob(media_store.blob_path(sha), save_path)
+    print(f"      -> {label}: {os.path.basename(save_path)}")
+    return True
+
+def download_image(url, save_path, min_bytes=0, ops=()):
+    """Download image from URL to save_path (see save_image_bytes for min_bytes/ops)
+
+    Page URLs are usually thumbnails (..._60x60q90.jpg, ..._.webp), so the original
+    asset is tried first, then large renditions, then the URL as given
+    (image_urls.candidate_urls); the first one that passes the checks wins.
+    """
+    candidates = image_urls.candidate_urls(url)
+    error = None
+    for rung, candidate in enumerate(candidates):
+        try:
+            # Served from the on-disk HTTP cache when fresh, revalidated (304) when stale
+            content = IMAGE_CACHE.fetch(candidate, timeout=10)
+        except Exception as e:
+            error = e
+            continue
+        label = 'Downloaded original' if rung == 0 and len(candidates) > 1 else 'Downloaded'
+        if save_image_bytes(content, save_path, min_bytes, ops, label):
+            return True
+    print(f"      -> Failed to download {url}: {error or 'no usable size'}")
+    return False
+
+class MediaDownloadQueue:
+    """Background download stage for one product's media.
+
+    The browser thread only enqueues (url, path) pairs and keeps scraping; downloads
+    run on a small thread pool sharing the pooled session. join() waits for the
+    product's downloads and returns the paths that failed, and run_fallbacks() then
+    runs their screenshot fallbacks back on the browser thread.
+    """
+
+    def __init__(self, max_workers=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or DOWNLOAD_WORKERS, thread_name_prefix='media-dl')
+        self._pending = []
+        self._fallbacks = {}
+        self.results = {}
+
+    def enqueue(self, url, save_path, min_bytes=1000, pad=True, fallback=None, capture=None):
+        """Queue a download. fallback() is called after join() if the download fails.
+
+        capture is the page's NetworkImageCapture: if Chrome already has the original
+        asset, that copy is stored instead of downloading url.
+        """
+        body = capture.body(url) if capture is not None else None
+        future = self._pool.submit(self._download, url, save_path, min_bytes, pad, body, capture)
+        self._pending.append((save_path, future))
+        if fallback is not None:
+            self._fallbacks[save_path] = fallback
+        return future
+
+    @staticmethod
+    def _download(url, save_path, min_bytes, pad, body=None, capture=None):
+        # Padding happens in memory on the way to disk: one decode, one encode
+        ops = image_pipeline.GALLERY_OPS if pad else image_pipeline.DETAIL_OPS
+        # body is only ever the original asset (NetworkImageCapture.body)
+        if body and save_image_bytes(body, save_path, min_bytes, ops, 'Saved from browser'):
+            capture.record_served()
+            return True
+        return download_image(url, save_path, min_bytes, ops)
+
+    def join(self):
+        """Wait for everything queued so far; return the paths whose download failed."""
+        failed = []
+        for save_path, future in self._pending:
+            try:
+                ok = future.result()
+            except Exception as e:
+                print(f"      -> Download worker error for {os.path.basename(save_path)}: {e}")
+                ok = False
+            self.results[save_path] = ok
+            if not ok:
+                failed.append(save_path)
+        self._pending = []
+        return failed
+
+    def run_fallbacks(self, failed_paths):
+        """Run screenshot fallbacks (browser thread only) for failed downloads."""
+        for save_path in failed_paths:
+            fallback = self._fallbacks.get(save_path)
+            if fallback is None:
+                continue
+            print(f"      -> Download failed, using smart screenshot for {os.path.basename(save_path)}...")
+            try:
+                self.results[save_path] = bool(fallback())
+            except Exception as e:
+                print(f"      -> Screenshot fallback failed for {os.path.basename(save_path)}: {e}")
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+def recapture_gallery_item(driver, thumb, save_path, min_bytes):
+    """Screenshot fallback for a gallery item: re-select its thumbnail and capture the main area."""
     try:
-        # Handle protocol-relative URLs
-        if url.startswith('//'):
-            url = 'https:' + url
-        
-        response = requests.get(url, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-        
-        with open(save_path, 'wb') as f:
-            f.write(response.content)
-        print(f"      -> Downloaded: {os.path.basename(save_path)}")
-        return True
+        driver.execute_script("window.scrollTo(0, 0);")
+        previous_src = get_main_image_src(driver)
+        thumb.click()
+        wait_for_main_image(driver, previous_src, thumb.get_attribute('src') or '')
+        image_area = driver.find_element(By.CSS_SELECTOR, PRODUCT_IMAGE_AREA_SELECTOR)
+        try:
+            main_img = image_area.find_element(By.CSS_SELECTOR, MAIN_IMAGE_SELECTOR)
+        except Exception:
+            main_img = None
+        if main_img is not None:
+            # Already padded by capture_full_image_screenshot
+            return capture_full_image_screenshot(driver, main_img, save_path)
+        return capture_area_screenshot(image_area, save_path, min_bytes)
     except Exception as e:
-        print(f"      -> Failed to download {url}: {e}")
+        print(f"      -> Failed to re-capture {os.path.basename(save_path)}: {e}")
         return False
 
-def ensure_uniform_margin(image_path, margin_px: int = 20, background=(255, 255, 255)):
-    """Add a uniform margin around the saved image to ensure consistent framing."""
+def finalize_pending_media(pending_media, results):
+    """Drop failed captures and renumber the rest so XX_01..XX_NN stay contiguous.
+
+    pending_media is a list of (type, path) in capture order. Paths missing from
+    results were captured synchronously (screenshots) and count as successful.
+    Surviving files are ingested into the blob store, so byte-identical images
+    (e.g. the same product under two slugs) share one copy on disk.
+    Detail images matching one operators deleted before (perceptual_hash.py) are
+    dropped, and the kept ones are recorded so future deletions can be learned.
+    Captures that look like an earlier capture of the same product (Main, then
+    Catalogue, then Details, in capture order) are dropped as near-duplicates.
+    Returns {type: [filename, ...]}.
+    """
+    finalized = {}
+    survivors = []
+    hashes = {}
+    unwanted = perceptual_hash.unwanted_index()
+    kept = perceptual_hash.BKTree()
+    for media_type, path in pending_media:
+        if not (results.get(path, True) and os.path.exists(path)):
+            if os.path.exists(path):
+                os.remove(path)
+            continue
+        try:
+            hashes[path] = perceptual_hash.hash_file(path)
+        except Exception as e:
+            print(f"      -> Could not hash {os.path.basename(path)}: {e}")
+        if path in hashes:
+            match = unwanted.match(hashes[path]) if media_type == 'Details' and len(unwanted) else None
+            if match:
+                sha, entry = match
+                print(f"      -> Dropped {os.path.basename(path)} (dHash {hashes[path]['dhash']}): matches previously "
+                      f"deleted {entry['source']} (dHash {entry['dhash']}, sha {sha[:12]}, "
+                      f"perceptual_hash.py --forget to undo)")
+                os.remove(path)
+                continue
+            duplicate_of = kept.find_near_duplicate(hashes[path])
+            if duplicate_of:
+                print(f"      -> Dropped {os.path.basename(path)}: near-duplicate of {duplicate_of}")
+                os.remove(path)
+                continue
+            kept.add(hashes[path], f"{media_type}/{os.path.basename(path)}")
+        survivors.append((media_type, path))
+
+    counters = {}
+    captured = {}
+    # Rewrite the record even if nothing survived, so stale entries aren't learned as deletions
+    details_folder = next((os.path.dirname(p) for t, p in pending_media if t == 'Details'), None)
+    for media_type, path in survivors:
+        folder, filename = os.path.split(path)
+        match = re.match(r'^(Catalogue|Detail)_\d+\.jpg$', filename)
+        if match:
+            counters[media_type] = counters.get(media_type, 0) + 1
+            filename = f"{match.group(1)}_{counters[media_type]:02d}.jpg"
+            target = os.path.join(folder, filename)
+            if target != path:
+                os.replace(path, target)
+        finalized.setdefault(media_type, []).append(filename)
+        try:
+            sha, deduplicated = media_store.ingest_file(os.path.join(folder, filename))
+            if deduplicated:
+                print(f"      -> {filename} is identical to a stored image, linked instead of kept")
+        except OSError as e:
+            print(f"      -> Could not add {filename} to the blob store: {e}")
+            continue
+        if media_type == 'Details' and path in hashes:
+            captured[filename] = dict(hashes[path], sha=sha)
+    if details_folder:
+        try:
+            perceptual_hash.record_captured(details_folder, captured)
+        except OSError as e:
+            print(f"      -> Could not record detail captures: {e}")
+    return finalized
+
+def capture_area_screenshot(element, save_path, min_bytes=1000):
+    """Screenshot an element (e.g. the whole image area) straight into a padded JPEG."""
+    png = element.screenshot_as_png
+    if len(png) <= min_bytes:
+        return False
     try:
-        from PIL import Image
-        with Image.open(image_path) as im:
-            # Convert to RGB to avoid mode issues
-            if im.mode in ("RGBA", "P"):
-                im = im.convert("RGB")
-            new_im = Image.new("RGB", (im.width + margin_px * 2, im.height + margin_px * 2), background)
-            new_im.paste(im, (margin_px, margin_px))
-            new_im.save(image_path, quality=92)
-        return True
-    except Exception as e:
-        print(f"      -> Failed to add margin to {os.path.basename(image_path)}: {e}")
+        return image_pipeline.write_image(png, save_path, image_pipeline.AREA_SCREENSHOT_OPS)
+    except image_pipeline.ImageRejected as e:
+        print(f"      -> Rejected screenshot of {os.path.basename(save_path)}: {e}")
         return False
 
 def stitch_images_vertically(image_paths, output_path, max_width=1200, spacing=0):
@@ -225,36 +610,91 @@ def stitch_images_vertically(image_paths, output_path, max_width=1200, spacing=0
         print(f"      -> Error stitching images: {e}")
         return False
 
-def is_video_element(element):
-    """Check if an element or its URL indicates a video."""
+# One round trip per section: everything the gallery/detail filters need, for every image.
+# WebElements inside the returned objects come back as Selenium WebElements.
+COLLECT_IMAGES_JS = """
+var nodes = arguments[0];
+var selector = arguments[1] || 'img';
+if (!Array.isArray(nodes)) {
+    nodes = nodes ? Array.prototype.slice.call(nodes.querySelectorAll(selector)) : [];
+}
+var out = [];
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    var rect = el.getBoundingClientRect();
+    var urlAttrs = {};
+    for (var j = 0; j < el.attributes.length; j++) {
+        var a = el.attributes[j];
+        if (a.value && (a.value.indexOf('http') !== -1 || a.value.indexOf('img') !== -1)) {
+            urlAttrs[a.name] = a.value;
+        }
+    }
+    var isImg = el.tagName === 'IMG';
+    out.push({
+        element: el,
+        tag: el.tagName.toLowerCase(),
+        src: el.getAttribute('src') ? el.src : '',
+        dataSrc: el.getAttribute('data-src') || '',
+        dataLazySrc: el.getAttribute('data-lazy-src') || '',
+        dataOriginal: el.getAttribute('data-original') || '',
+        urlAttrs: urlAttrs,
+        className: el.getAttribute('class') || '',
+        id: el.id || '',
+        width: Math.round(rect.width),
+        height: Math.round(rect.height),
+        top: Math.round(rect.top + window.pageYOffset),
+        left: Math.round(rect.left + window.pageXOffset),
+        loaded: isImg && el.complete && el.naturalWidth > 0
+    });
+}
+return out;
+"""
+
+def snapshot_images(driver, elements_or_root, selector='img'):
+    """Snapshot images in a single execute_script call.
+
+    Accepts a list of elements or a root element (searched with selector).
+    Returns dicts with element, tag, src, dataSrc/dataLazySrc/dataOriginal,
+    urlAttrs, className, id, width, height, top, left and loaded.
+    """
+    if not elements_or_root:
+        return []
     try:
-        tag = element.tag_name.lower()
-        if tag == 'video':
-            return True
-        
-        # Check src for video indicators
-        src = element.get_attribute('src') or ''
-        if any(vid in src.lower() for vid in ['video', 'mp4', 'webm', '.mov', 'play', '.avi']):
-            return True
-        
-        # Check class/id for video indicators
-        class_attr = element.get_attribute('class') or ''
-        id_attr = element.get_attribute('id') or ''
-        if 'video' in class_attr.lower() or 'video' in id_attr.lower():
-            return True
-        
-        return False
-    except:
-        return False
+        return driver.execute_script(COLLECT_IMAGES_JS, elements_or_root, selector) or []
+    except Exception as e:
+        print(f"      -> Image snapshot failed: {e}")
+        return []
+
+def snapshot_url(info: Dict) -> str:
+    """Image URL from a snapshot: src first, then Taobao's lazy-loading attributes."""
+    return (info.get('src') or info.get('dataSrc') or
+            info.get('dataLazySrc') or info.get('dataOriginal') or '')
+
+def is_video_element(info: Dict) -> bool:
+    """Check if an image snapshot (see snapshot_images) or its URL indicates a video."""
+    if info.get('tag') == 'video':
+        return True
+    
+    # Check src for video indicators
+    src = (info.get('src') or '').lower()
+    if any(vid in src for vid in ['video', 'mp4', 'webm', '.mov', 'play', '.avi']):
+        return True
+    
+    # Check class/id for video indicators
+    if 'video' in (info.get('className') or '').lower() or 'video' in (info.get('id') or '').lower():
+        return True
+    
+    return False
 
 def capture_full_image_screenshot(driver, img_element, save_path, max_attempts=3):
     """
     Intelligently capture a full screenshot of an image element.
     Ensures the image is fully visible in the viewport with proper margins.
+    The screenshot is validated and padded in memory and written once (image_pipeline).
     """
+    media_store.detach(save_path)  # Never screenshot into a file shared with the blob store
     try:
-        from PIL import Image
-        import io
+        import PIL  # noqa: F401 - screenshots are validated and padded with Pillow
         
         # Get image dimensions
         img_height = img_element.size['height']
@@ -266,14 +706,8 @@ def capture_full_image_screenshot(driver, img_element, save_path, max_attempts=3
         # If image is taller than viewport, we need special handling
         if img_height > viewport_height * 0.8:
             print(f"      -> Image is tall ({img_height}px), using element screenshot...")
-            # For tall images, take element screenshot directly
-            img_element.screenshot(save_path)
-            if os.path.exists(save_path) and os.path.getsize(save_path) > 1000:
-                # Add uniform margin for consistency
-                try:
-                    ensure_uniform_margin(save_path)
-                except:
-                    pass
+            # For tall images, take element screenshot directly (padded for consistency)
+            if capture_area_screenshot(img_element, save_path, 1000):
                 return True
         
         # Otherwise, position image in center of viewport with margins
@@ -288,7 +722,9 @@ def capture_full_image_screenshot(driver, img_element, save_path, max_attempts=3
                     window.scrollTo(0, middle);
                 """, img_element)
                 
-                time.sleep(1.5)  # Wait for scroll to complete
+                # Wait for the scroll to paint and the image to finish loading
+                wait_for_scroll_settled(driver)
+                wait_for_image_ready(driver, img_element)
                 
                 # Verify image is fully in viewport
                 is_fully_visible = driver.execute_script("""
@@ -303,25 +739,18 @@ def capture_full_image_screenshot(driver, img_element, save_path, max_attempts=3
                 """, img_element)
                 
                 # Take screenshot
-                img_element.screenshot(save_path)
+                png = img_element.screenshot_as_png
                 
-                # Verify screenshot is valid
-                if os.path.exists(save_path) and os.path.getsize(save_path) > 1000:
-                    # Check if image looks complete (not cut off)
+                # Verify screenshot is valid: the aspect and quality checks reject cut-off,
+                # blank and half-loaded captures, then the margin is added for uniform
+                # framing, all in one decode/encode
+                if len(png) > 1000:
                     try:
-                        with Image.open(save_path) as img:
-                            img_ratio = img.width / img.height
-                            # Basic validation: image should have reasonable aspect ratio
-                            if 0.1 < img_ratio < 10:  # Not too thin/wide
-                                # Add margin for uniform framing
-                                try:
-                                    ensure_uniform_margin(save_path)
-                                except:
-                                    pass
-                                return True
-                            else:
-                                print(f"      -> Unusual aspect ratio, retrying...")
-                    except:
+                        image_pipeline.write_image(png, save_path, image_pipeline.SCREENSHOT_OPS)
+                        return True
+                    except image_pipeline.ImageRejected as e:
+                        print(f"      -> Rejected screenshot ({e}), retrying...")
+                    except Exception:
                         pass
                 
                 # If we got here, try adjusting position
@@ -329,7 +758,7 @@ def capture_full_image_screenshot(driver, img_element, save_path, max_attempts=3
                     # Micro-adjust: scroll up or down slightly
                     adjustment = 50 if attempt == 0 else -50
                     driver.execute_script(f"window.scrollBy(0, {adjustment});")
-                    time.sleep(0.5)
+                    wait_for_scroll_settled(driver)
                     
             except Exception as e:
                 if attempt == max_attempts - 1:
@@ -342,13 +771,7 @@ def capture_full_image_screenshot(driver, img_element, save_path, max_attempts=3
         # PIL not available, fall back to basic screenshot
         print(f"      -> PIL not available, using basic screenshot...")
         img_element.screenshot(save_path)
-        ok = os.path.exists(save_path) and os.path.getsize(save_path) > 1000
-        if ok:
-            try:
-                ensure_uniform_margin(save_path)
-            except:
-                pass
-        return ok
+        return os.path.exists(save_path) and os.path.getsize(save_path) > 1000
     except Exception as e:
         print(f"      -> Error capturing full image: {e}")
         return False
@@ -416,8 +839,250 @@ def get_taobao_urls(file_path):
         urls = [line.strip() for line in file if line.strip() and not line.startswith('#')]
     return urls
 
-def scrape_product_variants(driver, url, product_index):
-    """Scrape product variants and download all associated media"""
+class ScrapeCheckpoint:
+    """Durable work queue backed by shared/data/scrape_queue.json.
+
+    Every finished product is appended to the CSV and recorded in the queue file
+    straight away, so a crash only loses the product in flight. If the previous
+    run was interrupted (its queue is not empty), re-running resumes it: completed
+    URLs are skipped and failed ones retried. Otherwise a new pass starts. URLs
+    that failed MAX_SCRAPE_ATTEMPTS times are skipped until --fresh.
+
+    Queue file layout:
+        queue:     [{"url", "index"}]                            still to do this run
+        completed: [{"url", "index", "variants", "completed_at"}]
+        failed:    [{"url", "index", "attempts", "last_error", "last_attempt"}]
+    """
+
+    def __init__(self, csv_path=CSV_OUTPUT_FILE, queue_path=SCRAPE_QUEUE_FILE, fresh=False):
+        self.csv_path = csv_path
+        self.queue_path = queue_path
+        self._lock = threading.Lock()
+        self.state = {'queue': [], 'completed': [], 'failed': []}
+        if not fresh and os.path.exists(queue_path):
+            try:
+                with open(queue_path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                for key in self.state:
+                    self.state[key] = [e for e in loaded.get(key, []) if isinstance(e, dict) and e.get('url')]
+            except Exception as e:
+                print(f"⚠️  Could not read {queue_path}, starting a fresh queue: {e}")
+        if not self.state['queue']:
+            # Previous run finished: this is a new pass over the link file
+            self.state['completed'] = []
+        if not os.path.exists(csv_path) and self.state['completed']:
+            # Completed rows live in the CSV; without it those products must be scraped again
+            print(f"⚠️  {os.path.basename(csv_path)} is missing, re-queuing completed products")
+            self.state['completed'] = []
+        if not self.state['completed']:
+            self._start_csv()
+
+    def _start_csv(self):
+        # Keep columns added by translate.py so reused rows don't lose their translations
+        fieldnames = self._csv_fieldnames() if os.path.exists(self.csv_path) else CSV_FIELDNAMES
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+            csv.DictWriter(csvfile, fieldnames=fieldnames).writeheader()
+
+    def _csv_fieldnames(self):
+        # translate.py may have added columns; keep appending in the file's own layout
+        try:
+            with open(self.csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+                header = next(csv.reader(csvfile), None)
+            if header:
+                return header
+        except OSError:
+            pass
+        return CSV_FIELDNAMES
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.queue_path), exist_ok=True)
+        tmp_path = self.queue_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.queue_path)
+
+    def plan(self, urls):
+        """Return the (index, url) pairs still to scrape, in input order, and persist the queue."""
+        completed = {e['url'] for e in self.state['completed']}
+        failed = {e['url']: e for e in self.state['failed']}
+        work = []
+        for idx, url in enumerate(urls, 1):
+            if url in completed:
+                continue
+            attempts = failed.get(url, {}).get('attempts', 0)
+            if attempts >= MAX_SCRAPE_ATTEMPTS:
+                print(f"⏭️  Skipping {url} (failed {attempts} times, use --fresh to retry)")
+                continue
+            work.append((idx, url))
+        with self._lock:
+            self.state['queue'] = [{'url': url, 'index': idx} for idx, url in work]
+            self._save()
+        skipped = len(completed & set(urls))
+        if skipped:
+            print(f"♻️  Resuming: {skipped} product(s) already completed, {len(work)} to go")
+        return work
+
+    def record_success(self, url, idx, rows):
+        """Append a product's rows to the CSV and mark it completed."""
+        with self._lock:
+            with open(self.csv_path, 'a', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=self._csv_fieldnames(), extrasaction='ignore', restval='')
+                writer.writerows(rows)
+                csvfile.flush()
+                os.fsync(csvfile.fileno())
+            self.state['queue'] = [e for e in self.state['queue'] if e['url'] != url]
+            self.state['failed'] = [e for e in self.state['failed'] if e['url'] != url]
+            self.state['completed'] = [e for e in self.state['completed'] if e['url'] != url]
+            self.state['completed'].append({
+                'url': url,
+                'index': idx,
+                'variants': len(rows),
+                'completed_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            })
+            self._save()
+
+    def record_failure(self, url, idx, error):
+        with self._lock:
+            previous = next((e for e in self.state['failed'] if e['url'] == url), {})
+            self.state['queue'] = [e for e in self.state['queue'] if e['url'] != url]
+            self.state['failed'] = [e for e in self.state['failed'] if e['url'] != url]
+            self.state['failed'].append({
+                'url': url,
+                'index': idx,
+                'attempts': previous.get('attempts', 0) + 1,
+                'last_error': str(error)[:300],
+                'last_attempt': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            })
+            self._save()
+
+    def finalize(self, urls):
+        """Rewrite the CSV with products in input order and return all of its rows."""
+        with self._lock:
+            fieldnames = self._csv_fieldnames()
+            with open(self.csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+                rows = list(csv.DictReader(csvfile))
+            order = {url: i for i, url in enumerate(urls)}
+            rows.sort(key=lambda r: order.get(r.get('URL', ''), len(order)))  # stable within a product
+            for row in rows:
+                for column in NUMERIC_CSV_COLUMNS:
+                    value = row.get(column)
+                    if value not in (None, ''):
+                        try:
+                            row[column] = int(value) if re.fullmatch(r'-?\d+', value) else float(value)
+                        except ValueError:
+                            pass
+            tmp_path = self.csv_path + '.tmp'
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore', restval='')
+                writer.writeheader()
+                writer.writerows(rows)
+            os.replace(tmp_path, self.csv_path)
+        return rows
+
+class CatalogIndex:
+    """Per-URL scrape history in shared/data/catalog_index.json.
+
+    The file is shared with export_manifest.py; the scraper adds a page
+    fingerprint so --incremental can tell unchanged products apart.
+    """
+
+    def __init__(self, path=CATALOG_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = {'last_updated': None, 'products': {}}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+                self.data.setdefault('products', {})
+            except Exception as e:
+                print(f"⚠️  Could not read catalog index {path}: {e}")
+
+    def entry(self, url):
+        return self.data['products'].get(url, {})
+
+    def scraped_within(self, url, ttl_hours):
+        try:
+            scraped_at = datetime.fromisoformat(self.entry(url).get('last_scraped'))
+            return datetime.now() - scraped_at < timedelta(hours=ttl_hours)
+        except (TypeError, ValueError):
+            return False
+
+    def record(self, url, title, fingerprint, variants):
+        with self._lock:
+            entry = self.data['products'].setdefault(url, {})
+            entry.setdefault('id', slugify(title)[:50])
+            entry.setdefault('title', title)
+            entry.update({
+                'last_scraped': datetime.now().isoformat(),
+                'status': 'active',
+                'variants': variants,
+                'fingerprint': fingerprint,
+            })
+            self.data['last_updated'] = datetime.now().isoformat()
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+def load_previous_rows(csv_path):
+    """Group the rows of an existing output CSV by product URL."""
+    previous = {}
+    if not os.path.exists(csv_path):
+        return previous
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if row.get('URL'):
+                previous.setdefault(row['URL'], []).append(row)
+    return previous
+
+def find_gallery_images(driver):
+    """Locate the gallery thumbnail <img> elements next to the main product image."""
+    try:
+        thumbnail_container = driver.find_element(By.CSS_SELECTOR, THUMBNAIL_CONTAINER_SELECTOR)
+        return thumbnail_container.find_elements(By.CSS_SELECTOR, 'img')
+    except:
+        try:
+            image_area = driver.find_element(By.CSS_SELECTOR, PRODUCT_IMAGE_AREA_SELECTOR)
+            parent = image_area.find_element(By.XPATH, './ancestor::div[contains(@class, "pic")]')
+            return parent.find_elements(By.CSS_SELECTOR, THUMBNAIL_IMAGE_SELECTOR)
+        except:
+            gallery_images = driver.find_elements(By.CSS_SELECTOR, THUMBNAIL_IMAGE_SELECTOR)
+            return [img for img in gallery_images if img.location['y'] < 500][:15]
+
+def compute_page_fingerprint(driver, product_title):
+    """Cheap change-detection pass: title, option labels and gallery URLs (no clicks, no downloads)."""
+    options = []
+    for button in driver.find_elements(By.CSS_SELECTOR, OPTION_BUTTONS_SELECTOR):
+        try:
+            options.append(button.text.strip())
+        except Exception:
+            continue
+    gallery = [info.get('src') or '' for info in snapshot_images(driver, find_gallery_images(driver))]
+    payload = json.dumps([product_title, options, gallery], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def scrape_product_variants(driver, url, product_index, catalog=None, previous_rows=None, variants_only=False):
+    """Scrape product variants and download all associated media.
+
+    With a catalog, the page fingerprint is recorded after a full scrape. If
+    previous_rows are also given and the fingerprint is unchanged, those rows are
+    returned as-is and media capture is skipped entirely.
+
+    With variants_only, only the variant rows are scraped (no media capture at
+    all) and media columns are carried over from previous_rows. A product with no
+    previous rows has no media to carry over, so it is scraped in full instead.
+    """
+    if variants_only and not previous_rows:
+        print(" -> No previous rows to reuse media from; scraping this product in full")
+        block_heavy_resources(driver, blocked=False)
+        try:
+            return scrape_product_variants(driver, url, product_index, catalog, previous_rows)
+        finally:
+            block_heavy_resources(driver)
+
+    # Records image responses from here on when the performance log is enabled (--network-capture)
+    capture = NetworkImageCapture(driver)
     driver.get(url)
     print(f"Scraping variants from: {url}")
     product_variants = []
@@ -432,13 +1097,22 @@ def scrape_product_variants(driver, url, product_index):
         product_title = get_product_title(driver)
         print(f" -> Found product: {product_title}")
         
+        fingerprint = None
+        if catalog is not None:
+            fingerprint = compute_page_fingerprint(driver, product_title)
+            if previous_rows and catalog.entry(url).get('fingerprint') == fingerprint:
+                print(" -> Unchanged since last scrape (title, options, gallery); reusing previous rows and media")
+                catalog.record(url, product_title, fingerprint, len(previous_rows))
+                return [dict(row) for row in previous_rows]
+
         slug_title = slugify(product_title)[:50]
         product_media_dir = os.path.join(MEDIA_DIR, f"product_{product_index}_{slug_title}")
-        os.makedirs(product_media_dir, exist_ok=True)
+        if not variants_only:
+            os.makedirs(product_media_dir, exist_ok=True)
         
         # Collect all media URLs with deduplication
         media_files = []
-        downloaded_urls = set()  # Track URLs to avoid duplicates
+        downloaded_urls = SeenUrls()  # Track images (any size/format variant of a URL) to avoid duplicates
 
         variant_rows: List[Dict] = []
 
@@ -478,13 +1152,16 @@ def scrape_product_variants(driver, url, product_index):
                 except Exception:
                     pass
 
+                previous_url = driver.current_url
+                previous_class = button.get_attribute('class') or ''
                 try:
                     button.click()
                 except Exception as e:
                     print(f"      -> Failed to click variant '{option_name}': {e}")
                     continue
 
-                time.sleep(0.6)  # Wait for page to update after clicking variant
+                # Wait for page to update after clicking variant
+                wait_for_variant_applied(driver, button, previous_url, previous_class)
 
                 # Capture variant-specific URL after clicking
                 variant_url = driver.current_url
@@ -500,7 +1177,21 @@ def scrape_product_variants(driver, url, product_index):
             fallback_row = build_variant_row('Default')
             populate_price_fields(fallback_row)
             variant_rows.append(fallback_row)
+
+        if variants_only:
+            # Fast mode: skip STEP 1/1b/2 entirely, keep whatever media the last full scrape found
+            previous_media = previous_rows[0]
+            for row in variant_rows:
+                apply_media_counts(row, [])
+                for column in ('Media Folder', 'Main Images', 'Detail Images', 'Catalogue Images'):
+                    if previous_media.get(column) not in (None, ''):
+                        row[column] = previous_media[column]
+            return variant_rows
         
+        # Media downloads run in the background; the browser thread only enqueues them
+        downloads = MediaDownloadQueue()
+        pending_media = []  # (type, filepath) in capture order, finalized after downloads.join()
+
         # STEP 1 (M2): Get HERO image - first image unless it's a video (then second)
         print("    -> Collecting hero image...")
         main_folder = os.path.join(product_media_dir, 'Main')
@@ -509,53 +1200,37 @@ def scrape_product_variants(driver, url, product_index):
         main_captured = False
         
         try:
-            time.sleep(2)
-            gallery_images = []
+            # Wait for the main product image to be loaded before reading the gallery
+            wait_for_main_image(driver)
             
-            # Try to find gallery/thumbnail images
-            try:
-                thumbnail_container = driver.find_element(By.CSS_SELECTOR, THUMBNAIL_CONTAINER_SELECTOR)
-                gallery_images = thumbnail_container.find_elements(By.CSS_SELECTOR, 'img')
-            except:
-                try:
-                    image_area = driver.find_element(By.CSS_SELECTOR, PRODUCT_IMAGE_AREA_SELECTOR)
-                    parent = image_area.find_element(By.XPATH, './ancestor::div[contains(@class, "pic")]')
-                    gallery_images = parent.find_elements(By.CSS_SELECTOR, THUMBNAIL_IMAGE_SELECTOR)
-                except:
-                    gallery_images = driver.find_elements(By.CSS_SELECTOR, THUMBNAIL_IMAGE_SELECTOR)
-                    gallery_images = [img for img in gallery_images if img.location['y'] < 500][:15]
+            # Try to find gallery/thumbnail images, then read them all in one round trip
+            gallery_items = snapshot_images(driver, find_gallery_images(driver))
             
-            print(f"      -> Found {len(gallery_images)} gallery items")
+            print(f"      -> Found {len(gallery_items)} gallery items")
             
             # M2: Hero selection - skip videos, take first valid image
             hero_index = -1
-            for idx, thumb in enumerate(gallery_images[:10]):
+            for idx, info in enumerate(gallery_items[:10]):
                 try:
                     # Check if this is a video (OMIT ALL VIDEOS)
-                    if is_video_element(thumb):
+                    if is_video_element(info):
                         print(f"      -> Item {idx+1} is video, skipping")
                         continue
                     
-                    thumb_url = thumb.get_attribute('src') or ''
-                    if any(vid in thumb_url.lower() for vid in ['video', 'mp4', 'webm', '.mov', 'play']):
-                        print(f"      -> Item {idx+1} is video (by URL), skipping")
-                        continue
+                    thumb_url = info.get('src') or ''
                     
                     # Skip gifs and tiny images
                     if thumb_url.lower().endswith('.gif'):
                         continue
-                    try:
-                        size = thumb.size
-                        if size['width'] < 80 or size['height'] < 80:
-                            continue
-                    except:
-                        pass
+                    if info.get('width', 0) < 80 or info.get('height', 0) < 80:
+                        continue
                     
                     # This is our hero - click to load in main area
                     hero_index = idx
                     print(f"      -> Hero is item {idx+1} (first non-video image)")
-                    thumb.click()
-                    time.sleep(2)  # Wait for main image to load
+                    previous_src = get_main_image_src(driver)
+                    info['element'].click()
+                    wait_for_main_image(driver, previous_src, thumb_url)  # Wait for main image to load
                     break
                     
                 except Exception as e:
@@ -582,39 +1257,34 @@ def scrape_product_variants(driver, url, product_index):
                         # As last resort, screenshot the whole image area
                         if main_img is None:
                             filepath = os.path.join(main_folder, 'Main.jpg')
-                            image_area.screenshot(filepath)
-                            if os.path.exists(filepath) and os.path.getsize(filepath) > 5000:
-                                try:
-                                    ensure_uniform_margin(filepath)
-                                except Exception:
-                                    pass
+                            if capture_area_screenshot(image_area, filepath, 5000):
                                 downloaded_urls.add(f"hero_area_{hero_index}")
-                                media_files.append({'type': 'Main', 'filename': 'Main.jpg'})
+                                pending_media.append(('Main', filepath))
                                 main_captured = True
                                 print(f"      -> ✓ Hero captured via area screenshot")
                                 raise StopIteration  # break out to skip further hero logic
                     
                     filepath = os.path.join(main_folder, 'Main.jpg')
+                    hero_thumb = gallery_items[hero_index]['element']
                     
-                    # Try download first
+                    # Try download first (in the background; screenshot fallback runs after join)
                     main_url = main_img.get_attribute('src') or ''
-                    download_success = False
                     if main_url and not main_url.startswith('data:'):
-                        download_success = download_image(main_url, filepath)
+                        downloads.enqueue(
+                            main_url, filepath, min_bytes=5000,
+                            fallback=lambda t=hero_thumb, p=filepath: recapture_gallery_item(driver, t, p, 5000),
+                            capture=capture,
+                        )
+                        downloaded_urls.add(main_url)
+                        pending_media.append(('Main', filepath))
+                        main_captured = True
+                        print(f"      -> ✓ Hero queued for download")
                     
                     # Fallback to HQ screenshot
-                    if not download_success or not (os.path.exists(filepath) and os.path.getsize(filepath) > 5000):
-                        print(f"      -> Using high-quality screenshot for hero")
-                        if capture_full_image_screenshot(driver, main_img, filepath):
-                            download_success = True
-                    
-                    if download_success and os.path.exists(filepath):
-                        try:
-                            ensure_uniform_margin(filepath)
-                        except:
-                            pass
-                        downloaded_urls.add(main_url if main_url else f"hero_{hero_index}")
-                        media_files.append({'type': 'Main', 'filename': 'Main.jpg'})
+                    elif capture_full_image_screenshot(driver, main_img, filepath) and os.path.exists(filepath):
+                        print(f"      -> Used high-quality screenshot for hero")
+                        downloaded_urls.add(f"hero_{hero_index}")
+                        pending_media.append(('Main', filepath))
                         main_captured = True
                         print(f"      -> ✓ Hero captured")
                         
@@ -638,35 +1308,30 @@ def scrape_product_variants(driver, url, product_index):
         catalogue_count = 0
         try:
             # Capture remaining gallery images (skip videos and hero)
-            for idx, thumb in enumerate(gallery_images):
+            for idx, info in enumerate(gallery_items):
                 if idx == hero_index:  # Skip hero, already captured
                     continue
                 
                 try:
                     # Skip videos
-                    if is_video_element(thumb):
-                        continue
-                    
-                    thumb_url = thumb.get_attribute('src') or ''
-                    if any(vid in thumb_url.lower() for vid in ['video', 'mp4', 'webm', '.mov', 'play']):
+                    if is_video_element(info):
                         continue
                     
+                    thumb = info['element']
+                    thumb_url = info.get('src') or ''
                     if thumb_url in downloaded_urls or not thumb_url:
                         continue
                     
                     # Skip gifs and tiny
                     if thumb_url.lower().endswith('.gif'):
                         continue
-                    try:
-                        size = thumb.size
-                        if size['width'] < 80 or size['height'] < 80:
-                            continue
-                    except:
-                        pass
+                    if info.get('width', 0) < 80 or info.get('height', 0) < 80:
+                        continue
                     
                     # Click and capture
+                    previous_src = get_main_image_src(driver)
                     thumb.click()
-                    time.sleep(1.5)
+                    wait_for_main_image(driver, previous_src, thumb_url)
                     
                     try:
                         image_area = driver.find_element(By.CSS_SELECTOR, PRODUCT_IMAGE_AREA_SELECTOR)
@@ -680,32 +1345,38 @@ def scrape_product_variants(driver, url, product_index):
                         filename = f"Catalogue_{catalogue_count:02d}.jpg"
                         filepath = os.path.join(catalogue_folder, filename)
                         
-                        # Try download
+                        # Try download (in the background; screenshot fallback runs after join)
                         cat_url = ''
                         if main_img is not None:
                             cat_url = main_img.get_attribute('src') or ''
                         success = False
+                        if cat_url and cat_url in downloaded_urls:
+                            # Same picture as one already queued (e.g. the hero under another size suffix)
+                            print(f"      -> Skipping duplicate gallery image {idx+1}")
+                            catalogue_count -= 1
+                            continue
                         if cat_url and not cat_url.startswith('data:'):
-                            success = download_image(cat_url, filepath)
+                            downloads.enqueue(
+                                cat_url, filepath, min_bytes=2000,
+                                fallback=lambda t=thumb, p=filepath: recapture_gallery_item(driver, t, p, 2000),
+                                capture=capture,
+                            )
+                            success = True
                         
                         # Fallback screenshot
-                        if not success or not (os.path.exists(filepath) and os.path.getsize(filepath) > 2000):
+                        else:
+                            # Both captures come back padded
                             if main_img is not None:
                                 if capture_full_image_screenshot(driver, main_img, filepath):
                                     success = True
                             else:
                                 # Screenshot the area directly
-                                image_area.screenshot(filepath)
-                                if os.path.exists(filepath) and os.path.getsize(filepath) > 2000:
+                                if capture_area_screenshot(image_area, filepath, 2000):
                                     success = True
                         
-                        if success and os.path.exists(filepath):
-                            try:
-                                ensure_uniform_margin(filepath)
-                            except:
-                                pass
+                        if success:
                             downloaded_urls.add(cat_url if cat_url else f"cat_{idx}")
-                            media_files.append({'type': 'Catalogue', 'filename': filename})
+                            pending_media.append(('Catalogue', filepath))
                             print(f"      -> ✓ Catalogue {catalogue_count}")
                         else:
                             catalogue_count -= 1
@@ -720,7 +1391,7 @@ def scrape_product_variants(driver, url, product_index):
                 except Exception as e:
                     continue
             
-            print(f"      -> Collected {catalogue_count} gallery images")
+            print(f"      -> Queued {catalogue_count} gallery images")
             
         except Exception as e:
             print(f"    -> Error collecting gallery: {e}")
@@ -731,18 +1402,14 @@ def scrape_product_variants(driver, url, product_index):
         os.makedirs(details_folder, exist_ok=True)
         
         detail_count = 0
-        detail_image_paths = []
         try:
             # Scroll gradually to load detail section and trigger lazy loading
             print("      -> Scrolling to load detail section...")
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight / 3);")
-            time.sleep(2)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight / 2);")
-            time.sleep(2)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.75);")
-            time.sleep(2)
+            for fraction in (1 / 3, 1 / 2, 0.75):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight * arguments[0]);", fraction)
+                wait_for_lazy_content(driver, timeout=2)
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)  # Extra wait at bottom to ensure all images trigger loading
+            wait_for_lazy_content(driver, timeout=3)  # Longer ceiling at the bottom so all images trigger loading
             
             # Try to find detail section with more specific selectors
             detail_images = []
@@ -771,7 +1438,7 @@ def scrape_product_variants(driver, url, product_index):
                         continue
                 
                 if detail_section:
-                    detail_images = detail_section.find_elements(By.CSS_SELECTOR, 'img')
+                    detail_images = snapshot_images(driver, detail_section)
                     print(f"      -> Found {len(detail_images)} images in detail section")
             except Exception as e:
                 pass
@@ -781,54 +1448,26 @@ def scrape_product_variants(driver, url, product_index):
             if not detail_images:
                 print(f"      -> No detail section found, skipping detail images")
             
-            for img in detail_images:
+            for info in detail_images:
                 try:
-                    # Scroll the image into view to trigger lazy loading
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", img)
-                    time.sleep(1.5)  # Increased wait for lazy load to trigger
-                    
+                    img = info['element']
                     # Try multiple attribute names for the image URL
                     # Taobao uses various lazy loading attributes
-                    img_url = (img.get_attribute('src') or 
-                              img.get_attribute('data-src') or 
-                              img.get_attribute('data-lazy-src') or
-                              img.get_attribute('data-original'))
+                    img_url = snapshot_url(info)
                     
-                    # If still no src, wait more and try again
-                    if not img_url or img_url.startswith('data:'):
-                        time.sleep(2)
-                        img_url = (img.get_attribute('src') or 
-                                  img.get_attribute('data-src') or 
-                                  img.get_attribute('data-lazy-src') or
-                                  img.get_attribute('data-original'))
-                    
-                    # One more retry for stubborn images
-                    if not img_url or img_url.startswith('data:'):
-                        time.sleep(1.5)
-                        img_url = (img.get_attribute('src') or 
-                                  img.get_attribute('data-src') or 
-                                  img.get_attribute('data-lazy-src') or
-                                  img.get_attribute('data-original'))
+                    # Not loaded yet: scroll it into view to trigger lazy loading, wait for a
+                    # real src (READY_TIMEOUT ceiling), then re-snapshot just this image
+                    if not info.get('loaded') or not img_url or img_url.startswith('data:'):
+                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", img)
+                        wait_for_image_ready(driver, img)
+                        info = (snapshot_images(driver, [img]) or [info])[0]
+                        img_url = snapshot_url(info)
                     
                     # Debug: print what we found
-                    if not img_url or img_url.startswith('data:'):
-                        # Try to get ANY attribute that looks like a URL
-                        all_attrs = driver.execute_script(
-                            """
-                            var attrs = arguments[0].attributes;
-                            var result = {};
-                            for (var i = 0; i < attrs.length; i++) {
-                                if (attrs[i].value && (attrs[i].value.includes('http') || attrs[i].value.includes('img'))) {
-                                    result[attrs[i].name] = attrs[i].value;
-                                }
-                            }
-                            return result;
-                            """, img
-                        )
-                        if all_attrs:
-                            # Use the first URL we find
-                            img_url = list(all_attrs.values())[0]
-                            print(f"      -> Found URL in attribute: {list(all_attrs.keys())[0]}")
+                    if (not img_url or img_url.startswith('data:')) and info.get('urlAttrs'):
+                        # Use ANY attribute that looks like a URL
+                        attr_name, img_url = next(iter(info['urlAttrs'].items()))
+                        print(f"      -> Found URL in attribute: {attr_name}")
                     
                     if not img_url or img_url.startswith('data:') or img_url in downloaded_urls:
                         continue
@@ -838,12 +1477,8 @@ def scrape_product_variants(driver, url, product_index):
                         continue
                     
                     # Skip small images
-                    try:
-                        size = img.size
-                        if size['width'] < 100 or size['height'] < 100:
-                            continue
-                    except:
-                        pass
+                    if info.get('width', 0) < 100 or info.get('height', 0) < 100:
+                        continue
                     
                     # Skip gifs
                     if img_url.lower().endswith('.gif'):
@@ -853,27 +1488,14 @@ def scrape_product_variants(driver, url, product_index):
                     filename = f"Detail_{detail_count:02d}.jpg"
                     filepath = os.path.join(details_folder, filename)
                     
-                    # Try to download first
-                    download_success = False
-                    if img_url and not img_url.startswith('data:'):
-                        download_success = download_image(img_url, filepath)
-                        if download_success and os.path.exists(filepath) and os.path.getsize(filepath) > 1000:
-                            downloaded_urls.add(img_url)
-                            media_files.append({'type': 'Details', 'filename': filename})
-                            detail_image_paths.append(filepath)
-                            print(f"      -> ✓ Saved {filename}")
-                    
-                    # If download failed, use smart screenshot capture
-                    if not download_success:
-                        print(f"      -> Download failed, using smart screenshot for {filename}...")
-                        if capture_full_image_screenshot(driver, img, filepath):
-                            if os.path.exists(filepath) and os.path.getsize(filepath) > 1000:
-                                downloaded_urls.add(img_url if img_url else f"screenshot_{detail_count}")
-                                media_files.append({'type': 'Details', 'filename': filename})
-                                detail_image_paths.append(filepath)
-                                print(f"      -> ✓ Screenshot saved: {filename}")
-                        else:
-                            detail_count -= 1  # Don't count failed captures
+                    # Queue the download; smart screenshot capture runs after join if it fails
+                    downloads.enqueue(
+                        img_url, filepath, min_bytes=1000, pad=False,
+                        fallback=lambda el=img, p=filepath: capture_full_image_screenshot(driver, el, p),
+                        capture=capture,
+                    )
+                    downloaded_urls.add(img_url)
+                    pending_media.append(('Details', filepath))
                     
                     if detail_count >= 30:  # Limit to 30 detail images
                         break
@@ -881,7 +1503,7 @@ def scrape_product_variants(driver, url, product_index):
                 except Exception as e:
                     continue
             
-            print(f"      -> Collected {detail_count} detail images")
+            print(f"      -> Queued {detail_count} detail images")
             print(f"      -> ⚠️  Manual review needed: Delete unwanted images from Details/ folder")
             print(f"      -> Then run: python3 stitch-details.py product_{product_index}_{slug_title}")
             
@@ -894,11 +1516,27 @@ def scrape_product_variants(driver, url, product_index):
             #         print(f"      -> ✓ Long detail image created")
             
             driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
             
         except Exception as e:
             print(f"    -> Error collecting detail images: {e}")
 
+        # Wait for this product's background downloads, then screenshot anything that failed
+        print("    -> Waiting for media downloads...")
+        failed_paths = downloads.join()
+        if failed_paths:
+            print(f"      -> {len(failed_paths)} download(s) failed, using smart screenshots...")
+            downloads.run_fallbacks(failed_paths)
+        downloads.shutdown()
+        if capture.enabled:
+            print(f"    -> Network capture: {len(capture.image_urls())} image responses seen, "
+                  f"{capture.stats['served']} saved from the browser, {capture.stats['missed']} not in its buffer, "
+                  f"{capture.stats['renditions']} resized (original downloaded instead)")
+        for media_type, filenames in finalize_pending_media(pending_media, downloads.results).items():
+            media_files.extend({'type': media_type, 'filename': name} for name in filenames)
+        catalogue_count = sum(1 for m in media_files if m.get('type') == 'Catalogue')
+        detail_count = sum(1 for m in media_files if m.get('type') == 'Details')
+        print(f"      -> Collected {catalogue_count} gallery images, {detail_count} detail images")
+
         # STEP 3: CATALOGUE fallback - removed (already handled in step 1b)
         # Skip old catalogue logic
         catalogue_count_old = 0
@@ -968,6 +1606,9 @@ def scrape_product_variants(driver, url, product_index):
         for row in variant_rows:
             apply_media_counts(row, media_files)
             product_variants.append(row)
+
+        if catalog is not None and product_variants:
+            catalog.record(url, product_title, fingerprint, len(product_variants))
                 
     except NoSuchElementException:
         print(f" -> Error: A key selector was not found. Please re-check them.")
@@ -1010,6 +1651,9 @@ def export_products_manifest(all_scraped_data):
                     "url": url,
                     "images": [],
                     "detailLongImage": None,
+                    # WebP/AVIF srcset candidates per image URL. image_derivatives.py runs after
+                    # stitching and fills this in; here only existing Derived/ indexes are carried over
+                    "srcset": {},
                     "price_cny": row.get('Price CNY') or 0,
                     "price_cad": row.get('Price CAD') or 0,
                     "variants": []
@@ -1028,7 +1672,13 @@ def export_products_manifest(all_scraped_data):
                     # Long detail image
                     detail_count = row.get('Detail Images', 0) or 0
                     if detail_count > 0:
-                        products_map[url]["detailLongImage"] = f"/images/{media_slug}-Details_Long.jpg"
+                        # stitch-details.py --tiles writes a tile index instead of one tall JPEG
+                        tiled = os.path.exists(os.path.join(MEDIA_DIR, media_folder, 'Details', 'Details_Long.json'))
+                        suffix = 'json' if tiled else 'jpg'
+                        products_map[url]["detailLongImage"] = f"/images/{media_slug}-Details_Long.{suffix}"
+                    
+                    # Empty until image_derivatives.py has run for this product
+                    products_map[url]["srcset"] = load_srcsets(os.path.join(MEDIA_DIR, media_folder), media_slug)
             
             # Add variant
             option = row.get('Option Name', '')
@@ -1059,55 +1709,222 @@ def export_products_manifest(all_scraped_data):
         print(f"\n❌ Error exporting manifest: {e}")
         return False
 
-def main():
-    os.makedirs(MEDIA_DIR, exist_ok=True)
-    os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
-    
-    TAOBAO_URLS = get_taobao_urls(LINK_FILE)
-    if not TAOBAO_URLS:
-        return
-
-    # M1: Simplified startup - always use Selenium Manager with persistent profile
+def build_chrome_options(profile_dir, debug_port=9222, headless=False, network_capture=False):
+    """Chrome options shared by the single-session and worker-pool modes."""
     options = webdriver.ChromeOptions()
     options.page_load_strategy = 'normal'
     options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_argument(f"--user-data-dir={SELENIUM_PROFILE_DIR}")
+    options.add_argument(f"--user-data-dir={profile_dir}")
     options.add_argument('--start-maximized')
     options.add_argument('--disable-popup-blocking')
     options.add_argument('--no-first-run')
     options.add_argument('--disable-extensions')
     options.add_argument('--window-size=1920,1080')  # High-res for better screenshots
-    options.add_argument('--remote-debugging-port=9222')  # Allow remote debugging
+    if debug_port:
+        options.add_argument(f'--remote-debugging-port={debug_port}')  # Allow remote debugging
+    if headless:
+        options.add_argument('--headless=new')  # New headless mode keeps the logged-in profile working
+    if network_capture:
+        enable_performance_log(options)  # Image responses are read back over CDP
     options.add_experimental_option('excludeSwitches', ['enable-logging'])  # Reduce logging noise
-    
-    print("🚀 Starting Chrome with persistent profile (Selenium Manager)...")
-    print(f"   Profile: {SELENIUM_PROFILE_DIR}")
-    print("   Waiting for Chrome to launch...")
-    
+    return options
+
+def block_heavy_resources(driver, blocked=True):
+    """Stop Chrome from fetching images, media and fonts (--variants-only); blocked=False lifts it."""
     try:
-        driver = webdriver.Chrome(options=options)
-        driver.set_page_load_timeout(60)
-        print("✓ Chrome started successfully")
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': FAST_MODE_BLOCKED_URLS if blocked else []})
     except Exception as e:
-        print(f"❌ Failed to start Chrome: {e}")
-        print("   Make sure Chrome is installed and ChromeDriver is available")
+        print(f"   ⚠️  Could not block images/media via CDP: {e}")
+
+def clone_profile_for_worker(worker_id):
+    """Copy the logged-in Selenium profile so each worker Chrome keeps the Taobao session.
+
+    Chrome refuses to share a user-data-dir between processes, so every worker gets
+    its own copy. Lock files and caches are skipped to keep the copy small.
+    """
+    target = os.path.join(WORKER_PROFILES_DIR, f"worker_{worker_id}")
+    shutil.rmtree(target, ignore_errors=True)
+    if not os.path.isdir(SELENIUM_PROFILE_DIR):
+        print(f"   ⚠️  No profile at {SELENIUM_PROFILE_DIR} - run with --login-setup first")
+        os.makedirs(target, exist_ok=True)
+        return target
+    shutil.copytree(
+        SELENIUM_PROFILE_DIR,
+        target,
+        symlinks=True,
+        ignore_dangling_symlinks=True,
+        ignore=shutil.ignore_patterns('Singleton*', '*.lock', 'lockfile', 'Cache', 'Code Cache', 'GPUCache', 'Crashpad'),
+    )
+    return target
+
+def scrape_and_checkpoint(driver, link, idx, total, checkpoint, catalog=None, previous_rows=None, variants_only=False):
+    """Scrape one product and record the outcome in the checkpoint."""
+    print(f"\n{'='*60}")
+    print(f"Processing product {idx}/{total}")
+    print(f"{'='*60}")
+    try:
+        # Navigate directly in the same window instead of opening new tabs to avoid session issues
+        variants = scrape_product_variants(
+            driver, link, idx, catalog=catalog,
+            previous_rows=(previous_rows or {}).get(link),
+            variants_only=variants_only,
+        )
+    except Exception as e:
+        print(f"ERROR processing {link}: {e}")
+        checkpoint.record_failure(link, idx, e)
+        return []
+    if variants:
+        checkpoint.record_success(link, idx, variants)
+    else:
+        checkpoint.record_failure(link, idx, 'no variants scraped (login/CAPTCHA page or missing selectors)')
+    return variants
+
+def scrape_products_sequential(driver, work, total, checkpoint, catalog=None, previous_rows=None, variants_only=False):
+    """Scrape the queued (index, url) pairs with one browser session, in input order."""
+    for idx, link in work:
+        scrape_and_checkpoint(driver, link, idx, total, checkpoint, catalog, previous_rows, variants_only)
+        time.sleep(2)
+
+def scrape_products_parallel(work, total, checkpoint, workers, catalog=None, previous_rows=None, variants_only=False,
+                             network_capture=False):
+    """Spread products across a pool of isolated Chrome sessions.
+
+    Each worker runs its own Chrome on a cloned profile. Product indexes are
+    assigned up front, so media folder names are the same as a sequential run
+    regardless of which worker finishes first; checkpoint.finalize() restores
+    the input order of the CSV rows.
+    """
+    size_http_pool(workers)
+    idle_drivers = queue.Queue()
+    launched = []
+    for worker_id in range(1, workers + 1):
+        profile_dir = clone_profile_for_worker(worker_id)
+        try:
+            # No fixed remote-debugging port: the workers would collide on 9222
+            worker_driver = webdriver.Chrome(
+                options=build_chrome_options(profile_dir, debug_port=None, headless=variants_only,
+                                             network_capture=network_capture))
+            worker_driver.set_page_load_timeout(60)
+            if variants_only:
+                block_heavy_resources(worker_driver)
+        except Exception as e:
+            print(f"❌ Failed to start Chrome for worker {worker_id}: {e}")
+            continue
+        launched.append(worker_driver)
+        idle_drivers.put(worker_driver)
+        print(f"✓ Worker {worker_id} started ({profile_dir})")
+
+    if not launched:
+        print("❌ No worker browsers could be started")
         return
-    print(f"   Note: Session persists in {SELENIUM_PROFILE_DIR}")
-    all_scraped_data = []
+
+    def _scrape(idx, link):
+        worker_driver = idle_drivers.get()
+        try:
+            scrape_and_checkpoint(worker_driver, link, idx, total, checkpoint, catalog, previous_rows, variants_only)
+        finally:
+            time.sleep(2)
+            idle_drivers.put(worker_driver)
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(launched)) as pool:
+            futures = [pool.submit(_scrape, idx, link) for idx, link in work]
+            for future in as_completed(futures):
+                future.result()
+    finally:
+        for worker_driver in launched:
+            try:
+                worker_driver.quit()
+            except Exception:
+                pass
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape Taobao product variants and media")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of parallel Chrome sessions (default: 1, capped at CPU count)")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Ignore scrape_queue.json progress and start a new CSV")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Reuse previous rows/media for products that were scraped recently or are unchanged")
+    parser.add_argument('--ttl-hours', type=float, default=INCREMENTAL_TTL_HOURS,
+                        help=f"With --incremental, skip products scraped within this many hours (default: {INCREMENTAL_TTL_HOURS})")
+    parser.add_argument('--variants-only', action='store_true',
+                        help="Fast headless run: refresh variant names/URLs only, no images or media capture")
+    parser.add_argument('--network-capture', action='store_true',
+                        help="Save images Chrome already loaded (CDP performance log) instead of downloading them again")
+    args = parser.parse_args()
+
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
     
-    # Lightweight rule-based translations will be applied later without external API
+    TAOBAO_URLS = get_taobao_urls(LINK_FILE)
+    if not TAOBAO_URLS:
+        return
+
+    catalog = CatalogIndex()
+    # Read before the checkpoint starts a new CSV
+    previous_rows = load_previous_rows(CSV_OUTPUT_FILE) if args.incremental or args.variants_only else None
+    checkpoint = ScrapeCheckpoint(fresh=args.fresh)
+    work = checkpoint.plan(TAOBAO_URLS)
 
-    for idx, link in enumerate(TAOBAO_URLS, 1):
-        print(f"\n{'='*60}")
-        print(f"Processing product {idx}/{len(TAOBAO_URLS)}")
-        print(f"{'='*60}")
+    if args.incremental:
+        recent = [(idx, url) for idx, url in work
+                  if previous_rows.get(url) and catalog.scraped_within(url, args.ttl_hours)]
+        for idx, url in recent:
+            checkpoint.record_success(url, idx, previous_rows[url])
+        work = [item for item in work if item not in recent]
+        print(f"⏭️  Incremental: reused {len(recent)} product(s) scraped within {args.ttl_hours:g}h, "
+              f"fingerprinting {len(work)}")
+    workers = max(1, min(args.workers, os.cpu_count() or 1, len(work) or 1))
+    driver = None
+    # Media-less rows must not overwrite the fingerprints of full scrapes
+    scrape_catalog = None if args.variants_only else catalog
+    # Images are blocked in variants-only mode, so there would be nothing to capture
+    network_capture = args.network_capture and not args.variants_only
+    if args.variants_only:
+        print("⚡ Variants-only mode: headless Chrome, images/media/fonts blocked, no media capture")
+
+    if not work:
+        print("✅ Nothing left to scrape")
+    elif workers > 1:
+        print(f"🚀 Starting {workers} Chrome workers with cloned profiles...")
+        print(f"   Source profile: {SELENIUM_PROFILE_DIR}")
+        scrape_products_parallel(work, len(TAOBAO_URLS), checkpoint, workers, scrape_catalog, previous_rows,
+                                 args.variants_only, network_capture)
+    else:
+        # M1: Simplified startup - always use Selenium Manager with persistent profile
+        options = build_chrome_options(SELENIUM_PROFILE_DIR, headless=args.variants_only,
+                                       network_capture=network_capture)
+        
+        print("🚀 Starting Chrome with persistent profile (Selenium Manager)...")
+        print(f"   Profile: {SELENIUM_PROFILE_DIR}")
+        print("   Waiting for Chrome to launch...")
+        
         try:
-            # Navigate directly in the same window instead of opening new tabs to avoid session issues
-            variants = scrape_product_variants(driver, link, idx)
-            all_scraped_data.extend(variants)
+            driver = webdriver.Chrome(options=options)
+            driver.set_page_load_timeout(60)
+            if args.variants_only:
+                block_heavy_resources(driver)
+            print("✓ Chrome started successfully")
         except Exception as e:
-            print(f"ERROR processing {link}: {e}")
-        time.sleep(2)
+            print(f"❌ Failed to start Chrome: {e}")
+            print("   Make sure Chrome is installed and ChromeDriver is available")
+            return
+        print(f"   Note: Session persists in {SELENIUM_PROFILE_DIR}")
+        
+        # Lightweight rule-based translations will be applied later without external API
+        scrape_products_sequential(driver, work, len(TAOBAO_URLS), checkpoint, scrape_catalog, previous_rows,
+                                   args.variants_only)
+
+    all_scraped_data = checkpoint.finalize(TAOBAO_URLS)
+    failed = checkpoint.state['failed']
+    if failed:
+        print(f"\n⚠️  {len(failed)} product(s) failed - re-run to retry (max {MAX_SCRAPE_ATTEMPTS} attempts):")
+        for entry in failed:
+            print(f"   [{entry.get('attempts', 0)}x] {entry['url']} - {entry.get('last_error', '')}")
 
     if not all_scraped_data:
         print("\nNo data was scraped. Please check your URLs and CSS selectors.")
@@ -1117,127 +1934,17 @@ def main():
     # Product and variant names stay in Chinese for Comet to translate
     print("\n✅ Scraping complete - names kept in Chinese for Comet translation")
     
-    # Keep translation functions commented out for reference (not used)
-    def _clean_text(s: str) -> str:
-        return (s or '').strip()
-
-    def translate_title_simple(zh: str) -> str:
-        if not zh:
-            return ''
-        # Common tactical gear term mappings
-        mapping = [
-            (r"战术背心", "Tactical Vest"), (r"通用型", "Universal"),
-            (r"MOLLE系统|MOLLE 系统", "MOLLE System"),
-            (r"手机导航面板", "Phone Navigation Panel"),
-            (r"胸口PDA包|胸包|胸前包", "Chest Bag"),
-            (r"多功能", "Multi-Function"), (r"户外", "Outdoor"), (r"配件", "Accessories"),
-            (r"战术耳机", "Tactical Headset"), (r"转接器", "Adapter"),
-            (r"民用", "Civilian"), (r"PTT按键", "PTT Button"), (r"发射", "Transmit"),
-            (r"对讲机", "Radio"), (r"建伍", "Kenwood"), (r"接口", "Interface"),
-            (r"支持", "Compatible"), (r"手枪箱", "Pistol Case"), (r"枪箱", "Gun Case"),
-            (r"手雷", "Grenade"), (r"玩具", "Toy"), (r"可爆炸水弹", "Water Bomb"),
-            (r"弹射烟雾", "Smoke Ejection"), (r"手榴弹模型", "Grenade Model"),
-            (r"男孩生日礼物", "Boys Birthday Gift"), (r"儿童", "Kids"),
-            (r"头盔", "Helmet"), (r"护目镜", "Goggles"), (r"手套", "Gloves"),
-            (r"腰带", "Belt"), (r"水壶", "Canteen"), (r"弹匣", "Magazine"),
-        ]
-        out = zh
-        for pat, rep in mapping:
-            out = re.sub(pat, rep, out)
-        # Remove decorative symbols/brackets
-        out = re.sub(r"[【】\[\]（）()]+", " ", out)
-        out = re.sub(r"\s+", " ", out).strip()
-        # Compact phrasing - keep only main phrases and remove duplicated words
-        parts = out.split()
-        seen = set()
-        compact = []
-        for w in parts:
-            lw = w.lower()
-            if lw not in seen:
-                compact.append(w)
-                seen.add(lw)
-        result = " ".join(compact)[:120]
-        # If still mostly Chinese, return original
-        if len([c for c in result if '\u4e00' <= c <= '\u9fff']) > len(result) * 0.5:
-            return zh
-        return result
-
-    def translate_variant_simple(zh: str) -> str:
-        if not zh:
-            return ''
-        s = re.sub(r"[【】\[\]（）()]", " ", zh)  # remove decorative brackets
-        s = re.sub(r"品牌|考度拉|科杜拉|尼龙|原厂|正品|仅支持|伯莱塔|SIG印字|M9A3印字|M9A4印字|加大款|小号|无LOGO|通用款|专用|空箱|带海绵内衬", " ", s)  # remove brand/filler
-        # Known color/pattern mappings
-        term_map = {
-            '黑色': 'Black', '狼灰色': 'Wolf Grey', '灰色': 'Grey', '灰': 'Grey',
-            '游骑兵绿色': 'Ranger Green', '军绿色': 'Army Green', '绿色': 'Green',
-            '狼棕色': 'Coyote Brown', '棕色': 'Brown', '卡其': 'Khaki',
-            '白色': 'White', '红色': 'Red', '蓝色': 'Blue', '黄色': 'Yellow',
-            '暗夜迷彩': 'Black Camouflage Pattern', '迷彩': 'Camouflage', '丛林迷彩': 'Jungle Camouflage',
-            '沙色': 'Sand', '土狼棕': 'Coyote Brown', '土狼': 'Coyote',
-            '建伍': 'Kenwood', '摩托罗拉': 'Motorola', '单插': 'Single', '双插': 'Dual',
-        }
-        # Split into chunks and translate
-        chunks = re.split(r"[\s,/，、]+", s)
-        out_chunks = []
-        for ch in chunks:
-            if not ch:
-                continue
-            # Keep codes like MC/BK/RG/CB/WG/BCP if present
-            code = None
-            m = re.search(r"\b(MC|CP|BK|RG|CB|WG|BCP|M1|M2|KEN)\b", ch, flags=re.IGNORECASE)
-            if m:
-                code = m.group(1).upper()
-            # Replace known Chinese terms
-            trans = ch
-            for k, v in term_map.items():
-                trans = trans.replace(k, v)
-            # If result still Chinese, drop it unless it has code
-            if re.search(r"[\u4e00-\u9fff]", trans):
-                if code:
-                    trans = code
-                else:
-                    continue
-            # Normalize like "MC Camouflage"
-            if code and 'Camouflage' in trans and code not in trans:
-                trans = f"{code} Camouflage"
-            # Skip pure English filler words
-            if trans.lower() in ['the', 'of', 'and', 'or', 'only', 'with', 'for']:
-                continue
-            out_chunks.append(trans)
-        # Join with separator for combos
-        result = " / ".join(dict.fromkeys([c.strip() for c in out_chunks if c.strip()]))
-        # If empty after translation, return simplified original
-        if not result:
-            result = re.sub(r"[【】\[\]（）()]", "", zh).strip()
-        return result
+    # Rule-based title/variant glossaries live in glossary.py (used by translate.py)
 
     # Keep names in Chinese - Comet will translate with context from Taobao page
     # No translation applied here - Comet handles all translation
 
-    fieldnames = [
-        'URL',  # Base product URL
-        'Product Title',  # Chinese product name (stays in Chinese - Comet will translate)
-        'Product Title ZH',  # Chinese product name
-        'Option Name',  # Chinese variant name (stays in Chinese - Comet will translate)
-        'Option Name ZH',  # Chinese variant name
-        'Variant URL',  # Variant-specific purchase URL (captured when variant is clicked)
-        'Price',
-        'Price CNY',
-        'Price CAD',
-        'Shipping CAD',
-        'Final CAD',
-        'Media Folder',
-        'Main Images',
-        'Detail Images',
-        'Catalogue Images'
-    ]
-    with open(CSV_OUTPUT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(all_scraped_data)
-
+    IMAGE_CACHE.close()
     print(f"\n✅ Scraping complete. {len(all_scraped_data)} variants saved to {CSV_OUTPUT_FILE}")
+    print(f"🗄️  {IMAGE_CACHE.summary()}")
+    removed, freed = media_store.prune(keep=IMAGE_CACHE.cached_shas())
+    if removed:
+        print(f"🧹 Pruned {removed} unreferenced blob(s) from the media store ({freed / (1024 * 1024):.1f} MB)")
     print(f"📁 Media files saved to {MEDIA_DIR}")
     print("\n📂 Folder structure:")
     print("  - Main/Main.jpg = Hero image (first non-video image)")
@@ -1247,6 +1954,20 @@ def main():
     
     # M5: Export products manifest for shop integration
     export_products_manifest(all_scraped_data)
+
+    if args.variants_only:
+        # Products with no previous rows were scraped in full; only their media needs review
+        fully_scraped = {url for _, url in work if not previous_rows.get(url)}
+        new_folders = sorted({row['Media Folder'] for row in all_scraped_data
+                              if row.get('URL') in fully_scraped and row.get('Media Folder')})
+        if not new_folders:
+            # Nothing new to review in media/ - no pause needed
+            if driver is not None:
+                driver.quit()
+            return
+        print(f"\n🆕 {len(new_folders)} new product(s) were scraped in full; review their media:")
+        for folder in new_folders:
+            print(f"   - {os.path.join(MEDIA_DIR, folder)}")
     
     print("\n" + "="*60)
     print("⏸️  PAUSE: Please review and filter images before continuing")
@@ -1262,7 +1983,8 @@ def main():
         input()
     except (EOFError, KeyboardInterrupt):
         print("\nExiting. You can run the next steps manually when ready.")
-        driver.quit()
+        if driver is not None:
+            driver.quit()
         return
 
 if __name__ == "__main__":
@@ -1310,4 +2032,8 @@ if __name__ == "__main__":
                 pass
         sys.exit(0)
     else:
-        main()
+        try:
+            main()
+        finally:
+            # Early returns, errors and Ctrl+C must not leave new cache bodies out of the index
+            IMAGE_CACHE.close()
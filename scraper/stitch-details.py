@@ -7,17 +7,95 @@ Usage:
     python3 stitch-details.py                    # Process all products
     python3 stitch-details.py product_1_slug     # Process specific product
     python3 stitch-details.py --confirm          # Skip confirmation prompt
+    python3 stitch-details.py --confirm --jobs 4 # Stitch 4 products in parallel
+    python3 stitch-details.py --tiles            # Fixed-height tiles + Details_Long.json index
+    python3 stitch-details.py --tiles --tile-format webp --tile-height 1200
+    python3 stitch-details.py --force            # Re-stitch even if inputs are unchanged
 """
 
+import contextlib
+import io
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from PIL import Image
 
+import http_cache
+import media_store
+import perceptual_hash
+
 # Configuration
 MEDIA_DIR = Path("media")
 MAX_WIDTH = 1200
 SPACING = 0  # Pixels between images (0 => seamless)
+TILE_HEIGHT = 1600  # Pixels per tile in --tiles mode (the last tile may be shorter)
+TILE_INDEX_NAME = "Details_Long.json"
+FINGERPRINT_NAME = "Details_Long.fingerprint.json"  # Inputs + parameters of the last stitch
+TILE_FORMATS = {
+    'jpg': ('JPEG', {'quality': 90, 'progressive': True, 'optimize': True}),
+    'webp': ('WEBP', {'quality': 85, 'method': 4}),
+}
+
+
+def target_size(width, height, max_width):
+    """Size an image is pasted at: scaled down to max_width, never up."""
+    if width > max_width:
+        ratio = max_width / width
+        return max_width, int(height * ratio)
+    return width, height
+
+
+def build_canvas(image_paths, max_width=1200, spacing=0):
+    """Paste images top to bottom onto one canvas and return it.
+
+    Two passes keep memory bounded to the canvas plus one image: the first only
+    reads image headers to lay out the canvas, the second decodes, resizes and
+    pastes one image at a time.
+    """
+    # Pass 1: sizes from headers only (Image.open doesn't decode pixels)
+    sizes = []
+    for path in image_paths:
+        with Image.open(path) as img:
+            sizes.append(target_size(img.width, img.height, max_width))
+    
+    # Calculate total height
+    total_height = sum(h for _, h in sizes) + spacing * max(len(sizes) - 1, 0)
+    
+    # Use the widest image width
+    canvas_width = max(w for w, _ in sizes)
+    
+    # Pass 2: decode, resize and paste one image at a time
+    canvas = None
+    y_offset = 0
+    for path, (width, height) in zip(image_paths, sizes):
+        with Image.open(path) as src:
+            # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 where that still covers the target
+            src.draft('RGB', (width, height))
+            img = src.convert('RGB') if src.mode != 'RGB' else src.copy()
+        if img.size != (width, height):
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        
+        if canvas is None:
+            # Pick canvas background that matches the first image to avoid white seams
+            canvas = Image.new('RGB', (canvas_width, total_height), img.getpixel((0, 0)))
+        
+        # Center horizontally if image is narrower than canvas
+        x_offset = (canvas_width - width) // 2
+        canvas.paste(img, (x_offset, y_offset))
+        y_offset += height + spacing
+        img.close()
+    
+    return canvas
+
+
+def save_atomic(img, output_path, fmt='JPEG', **params):
+    """Write-then-rename so a hardlinked output is never modified in place."""
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.stem + '.tmp' + output_path.suffix)
+    img.save(tmp_path, fmt, **params)
+    os.replace(tmp_path, output_path)
 
 
 def stitch_images_vertically(image_paths, output_path, max_width=1200, spacing=0):
@@ -27,55 +105,132 @@ def stitch_images_vertically(image_paths, output_path, max_width=1200, spacing=0
         return False
     
     try:
-        images = []
-        for path in image_paths:
-            img = Image.open(path)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Resize if too wide
-            if img.width > max_width:
-                ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-            
-            images.append(img)
-        
-        # Calculate total height
-        total_height = sum(img.height for img in images) + spacing * max(len(images) - 1, 0)
-        
-        # Use the widest image width
-        canvas_width = max(img.width for img in images)
-        # Pick canvas background that matches the first image to avoid white seams
-        base_color = images[0].getpixel((0, 0)) if images else (0, 0, 0)
-        
-        # Create canvas
-        canvas = Image.new('RGB', (canvas_width, total_height), base_color)
-        
-        # Paste images
-        y_offset = 0
-        for img in images:
-            # Center horizontally if image is narrower than canvas
-            x_offset = (canvas_width - img.width) // 2
-            canvas.paste(img, (x_offset, y_offset))
-            y_offset += img.height + spacing
-        
+        canvas = build_canvas(image_paths, max_width, spacing)
         # Save with high quality
-        canvas.save(output_path, 'JPEG', quality=95)
+        save_atomic(canvas, output_path, 'JPEG', quality=95)
+        canvas.close()
+        return True
+    
+    except Exception as e:
+        print(f"  ❌ Stitch error: {e}")
+        return False
+
+
+def tile_paths(details_dir: Path):
+    """Existing tile files (any format) in a Details/ folder."""
+    return sorted(p for ext in TILE_FORMATS for p in details_dir.glob(f"Details_Long_[0-9]*.{ext}"))
+
+
+def stitch_images_tiled(image_paths, details_dir: Path, tile_height=TILE_HEIGHT, tile_format='jpg',
+                        max_width=1200, spacing=0):
+    """Stitch images and cut the result into fixed-height tiles plus a JSON index.
+
+    Writes Details_Long_01.<ext>, Details_Long_02.<ext>, ... and Details_Long.json:
+    {"version": 1, "width", "height", "tileHeight", "format", "tiles": [{"src", "height"}]}.
+    The index is written last, so it never lists a tile that isn't on disk yet.
+    Returns the index dict, or None on failure.
+    """
+    if not image_paths:
+        print("  ⚠️  No images to stitch")
+        return None
+    
+    pil_format, params = TILE_FORMATS[tile_format]
+    try:
+        canvas = build_canvas(image_paths, max_width, spacing)
+        tiles = []
+        for top in range(0, canvas.height, tile_height):
+            bottom = min(top + tile_height, canvas.height)
+            name = f"Details_Long_{len(tiles) + 1:02d}.{tile_format}"
+            with canvas.crop((0, top, canvas.width, bottom)) as tile:
+                save_atomic(tile, details_dir / name, pil_format, **params)
+            tiles.append({'src': name, 'height': bottom - top})
+        index = {
+            'version': 1,
+            'width': canvas.width,
+            'height': canvas.height,
+            'tileHeight': tile_height,
+            'format': tile_format,
+            'tiles': tiles,
+        }
+        canvas.close()
         
-        # Close images
-        for img in images:
-            img.close()
+        index_path = details_dir / TILE_INDEX_NAME
+        tmp_path = index_path.with_name(index_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, index_path)
         
-        return True
+        # Drop tiles left over from an earlier, longer (or other-format) tile set
+        current = {t['src'] for t in tiles}
+        for stale in tile_paths(details_dir):
+            if stale.name not in current:
+                stale.unlink()
+        return index
     
     except Exception as e:
         print(f"  ❌ Stitch error: {e}")
+        return None
+
+
+def remove_tiles(details_dir: Path):
+    """Remove a tile set and its index (used when switching back to a single image)."""
+    for path in tile_paths(details_dir) + [details_dir / TILE_INDEX_NAME]:
+        if path.exists():
+            path.unlink()
+
+
+def stitch_fingerprint(detail_files, tiles=None):
+    """What a stitched output depends on: the ordered inputs and the stitch parameters."""
+    files = []
+    for f in detail_files:
+        stat = f.stat()
+        files.append([f.name, stat.st_size, stat.st_mtime_ns])
+    return {
+        'files': files,
+        'max_width': MAX_WIDTH,
+        'spacing': SPACING,
+        'tiles': list(tiles) if tiles else None,
+    }
+
+
+def outputs_exist(details_dir: Path, tiles=None):
+    """Whether the output for this mode (single image or index + every tile) is on disk."""
+    if not tiles:
+        return (details_dir / "Details_Long.jpg").exists()
+    try:
+        with open(details_dir / TILE_INDEX_NAME, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        return all((details_dir / t['src']).exists() for t in index['tiles'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+def is_up_to_date(details_dir: Path, fingerprint, tiles=None):
+    """True if the last stitch used exactly these inputs and parameters and its output is intact."""
+    try:
+        with open(details_dir / FINGERPRINT_NAME, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
         return False
+    return stored == fingerprint and outputs_exist(details_dir, tiles)
+
+
+def write_fingerprint(details_dir: Path, fingerprint):
+    path = details_dir / FINGERPRINT_NAME
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f, indent=2)
+    os.replace(tmp_path, path)
+
 
+def process_product_folder(product_folder: Path, skip_confirm=False, tiles=None, force=False):
+    """Process one product folder and stitch its detail images.
 
-def process_product_folder(product_folder: Path, skip_confirm=False):
-    """Process one product folder and stitch its detail images."""
+    tiles=(tile_height, tile_format) writes a tile set + index instead of Details_Long.jpg.
+    Folders whose inputs and parameters match the last stitch's fingerprint are
+    skipped unless force is set.
+    Returns True when stitched, False when skipped and None when stitching failed.
+    """
     details_dir = product_folder / "Details"
     
     if not details_dir.exists():
@@ -92,6 +247,11 @@ def process_product_folder(product_folder: Path, skip_confirm=False):
         print(f"  ⏭️  No detail images found")
         return False
     
+    fingerprint = stitch_fingerprint(detail_files, tiles)
+    if not force and is_up_to_date(details_dir, fingerprint, tiles):
+        print(f"  ⏭️  Up to date ({len(detail_files)} detail images unchanged)")
+        return False
+    
     print(f"  📸 Found {len(detail_files)} detail images")
     
     # Show files
@@ -110,6 +270,27 @@ def process_product_folder(product_folder: Path, skip_confirm=False):
     output_path = details_dir / "Details_Long.jpg"
     print(f"\n  🔄 Stitching {len(detail_files)} images...")
     
+    if tiles:
+        tile_height, tile_format = tiles
+        index = stitch_images_tiled(
+            detail_files,
+            details_dir,
+            tile_height=tile_height,
+            tile_format=tile_format,
+            max_width=MAX_WIDTH,
+            spacing=SPACING
+        )
+        if index is None:
+            return None
+        # The index replaces the single image; don't leave both for sync-media.js to copy
+        if output_path.exists():
+            output_path.unlink()
+        write_fingerprint(details_dir, fingerprint)
+        size_mb = sum((details_dir / t['src']).stat().st_size for t in index['tiles']) / (1024 * 1024)
+        print(f"  ✅ Created: {TILE_INDEX_NAME} + {len(index['tiles'])} tiles "
+              f"({index['width']}x{index['height']}, {size_mb:.2f} MB)")
+        return True
+    
     success = stitch_images_vertically(
         detail_files,
         output_path,
@@ -118,11 +299,30 @@ def process_product_folder(product_folder: Path, skip_confirm=False):
     )
     
     if success:
+        remove_tiles(details_dir)
+        write_fingerprint(details_dir, fingerprint)
         size_mb = output_path.stat().st_size / (1024 * 1024)
         print(f"  ✅ Created: {output_path.name} ({size_mb:.2f} MB)")
         return True
     else:
-        return False
+        return None
+
+
+def _stitch_folder(folder: Path, skip_confirm=False, tiles=None, force=False):
+    """process_product_folder() with unexpected errors reported as a failure (None)."""
+    try:
+        return process_product_folder(folder, skip_confirm=skip_confirm, tiles=tiles, force=force)
+    except Exception as e:
+        print(f"  ❌ Unexpected error: {e}")
+        return None
+
+
+def _stitch_folder_job(folder: Path, tiles=None, force=False):
+    """Process-pool entry point: stitch one folder, returning (result, captured output)."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = _stitch_folder(folder, skip_confirm=True, tiles=tiles, force=force)
+    return result, output.getvalue()
 
 
 def main():
@@ -131,8 +331,19 @@ def main():
     parser = argparse.ArgumentParser(description="Stitch detail images after manual filtering")
     parser.add_argument('product', nargs='?', help="Specific product folder name (optional)")
     parser.add_argument('--confirm', action='store_true', help="Skip confirmation prompts")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Stitch this many products in parallel processes (implies --confirm)")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-stitch even if the detail images and settings are unchanged")
+    parser.add_argument('--tiles', action='store_true',
+                        help=f"Write fixed-height tiles plus {TILE_INDEX_NAME} instead of one Details_Long.jpg")
+    parser.add_argument('--tile-height', type=int, default=TILE_HEIGHT,
+                        help=f"Tile height in pixels for --tiles (default: {TILE_HEIGHT})")
+    parser.add_argument('--tile-format', choices=sorted(TILE_FORMATS), default='jpg',
+                        help="Tile format for --tiles: progressive JPEG or WebP (default: jpg)")
     
     args = parser.parse_args()
+    tiles = (args.tile_height, args.tile_format) if args.tiles else None
     
     print("🖼️  Protocol Zero - Detail Image Stitcher")
     print("=" * 60)
@@ -159,23 +370,50 @@ def main():
     
     print(f"\n📦 Found {len(product_folders)} product folder(s)\n")
     
+    # Detail images deleted during manual review are remembered, so later scrapes drop them automatically
+    unwanted = perceptual_hash.UnwantedIndex()
+    learned = sum(perceptual_hash.learn_deletions(folder / "Details", unwanted) for folder in product_folders)
+    if learned:
+        unwanted.save()
+        print(f"🧠 Learned {learned} deleted detail image(s) ({len(unwanted)} in the unwanted index)\n")
+    # Images deleted during review no longer have product links; free their blobs
+    # (except raw downloads the HTTP cache still serves)
+    removed, freed = media_store.prune(keep=http_cache.cached_shas())
+    if removed:
+        print(f"🧹 Pruned {removed} unreferenced blob(s) ({freed / (1024 * 1024):.1f} MB)\n")
+    
     # Process each folder
     success_count = 0
     skip_count = 0
     fail_count = 0
     
-    for folder in product_folders:
-        print(f"📁 {folder.name}")
-        result = process_product_folder(folder, skip_confirm=args.confirm)
-        
+    def _tally(result):
+        nonlocal success_count, skip_count, fail_count
         if result:
             success_count += 1
         elif result is False:
             skip_count += 1
         else:
             fail_count += 1
-        
-        print()  # Blank line between products
+    
+    jobs = max(1, min(args.jobs, len(product_folders), os.cpu_count() or 1))
+    if jobs > 1:
+        # Prompts can't be answered from worker processes, so --jobs implies --confirm
+        print(f"⚙️  Stitching with {jobs} parallel jobs\n")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(_stitch_folder_job, folder, tiles, args.force): folder for folder in product_folders}
+            for future in as_completed(futures):
+                result, output = future.result()
+                print(f"📁 {futures[future].name}")
+                print(output, end='')
+                _tally(result)
+                print()  # Blank line between products
+    else:
+        for folder in product_folders:
+            print(f"📁 {folder.name}")
+            _tally(_stitch_folder(folder, skip_confirm=args.confirm or args.jobs > 1,
+                                  tiles=tiles, force=args.force))
+            print()  # Blank line between products
     
     # Summary
     print("=" * 60)
@@ -183,6 +421,7 @@ def main():
     print(f"⏭️  Skipped: {skip_count}")
     print(f"❌ Failed: {fail_count}")
     print(f"📊 Total: {len(product_folders)}")
+    return 1 if fail_count else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Checks for image_quality.py's blank and partial-render detection.
+
+Run with: python3 -m pytest scraper/test_image_quality.py
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+import image_quality
+
+
+def canvas(content_box, size=(800, 800)):
+    """White image with textured content filling content_box (left, top, right, bottom)."""
+    arr = np.full((size[1], size[0], 3), 255, dtype=np.uint8)
+    left, top, right, bottom = content_box
+    rng = np.random.default_rng(0)
+    arr[top:bottom, left:right] = rng.integers(0, 200, (bottom - top, right - left, 3), dtype=np.uint8)
+    return Image.fromarray(arr)
+
+
+def test_white_top_with_content_below_is_accepted():
+    # A product shot on white whose content sits in the lower half
+    assert image_quality.problem(canvas((0, 400, 800, 800))) is None
+
+
+def test_product_on_white_background_is_accepted():
+    assert image_quality.problem(canvas((200, 100, 600, 450))) is None
+
+
+def test_image_cut_off_at_the_bottom_is_rejected():
+    assert "bottom" in image_quality.problem(canvas((0, 0, 800, 400)))
+
+
+def test_image_cut_off_at_the_right_is_rejected():
+    assert "right" in image_quality.problem(canvas((0, 0, 400, 800)))
+
+
+def test_dark_band_is_not_a_partial_render():
+    arr = np.zeros((800, 800, 3), dtype=np.uint8)
+    arr[:400] = np.random.default_rng(0).integers(0, 255, (400, 800, 3), dtype=np.uint8)
+    assert image_quality.problem(Image.fromarray(arr)) is None
+
+
+def test_sparse_text_passes_the_download_check():
+    img = Image.new('RGB', (750, 400), (255, 255, 255))
+    img.paste((0, 0, 0), (40, 40, 400, 52))
+    assert image_quality.problem(img, check_bands=False, check_entropy=False) is None
+    assert image_quality.problem(Image.new('RGB', (750, 400), (255, 255, 255)), False, False)
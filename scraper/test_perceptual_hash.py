@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Checks for perceptual_hash.py's near-duplicate decision.
+
+Run with: python3 -m pytest scraper/test_perceptual_hash.py
+"""
+
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+import perceptual_hash
+
+
+def product_shot(color):
+    """The same shirt-like shape with shading on a white background, in one colour."""
+    img = Image.new('RGB', (400, 400), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    draw.polygon([(120, 60), (280, 60), (360, 140), (310, 180), (300, 360), (100, 360), (90, 180), (40, 140)],
+                 fill=color)
+    shade = tuple(max(0, c - 60) for c in color)
+    draw.rectangle((180, 60, 220, 360), fill=shade)
+    draw.ellipse((170, 40, 230, 90), fill=(255, 255, 255))
+    return img
+
+
+def hashes_of(img, quality=None):
+    buf = io.BytesIO()
+    img.save(buf, 'JPEG', quality=quality or 92)
+    buf.seek(0)
+    return perceptual_hash.hash_file(buf)
+
+
+def test_colorways_of_the_same_shot_both_survive():
+    # Similar luminance, so dHash/pHash alone can't tell them apart
+    red = hashes_of(product_shot((200, 60, 60)))
+    green = hashes_of(product_shot((60, 140, 60)))
+    assert perceptual_hash.hamming(int(red['dhash'], 16), int(green['dhash'], 16)) <= perceptual_hash.DHASH_MAX_DISTANCE
+    assert not perceptual_hash.is_near_duplicate(red, green)
+
+    kept = perceptual_hash.BKTree()
+    for name, hashes in (('red', red), ('green', green)):
+        assert kept.find_near_duplicate(hashes) is None, name
+        kept.add(hashes, name)
+    assert len(kept) == 2
+
+
+def test_recompressed_copy_is_a_near_duplicate():
+    shot = product_shot((200, 60, 60))
+    assert perceptual_hash.is_near_duplicate(hashes_of(shot), hashes_of(shot, quality=60))
+
+
+def test_hashes_without_color_never_match():
+    hashes = hashes_of(product_shot((200, 60, 60)))
+    legacy = dict(hashes, color=None)
+    assert not perceptual_hash.is_near_duplicate(hashes, legacy)
+
+
+def test_unwanted_index_is_stricter_than_within_product(tmp_path):
+    banner = hashes_of(product_shot((200, 60, 60)))
+    index = perceptual_hash.UnwantedIndex(str(tmp_path / 'unwanted.json'))
+    index.add('a' * 64, banner, 'product_1/Detail_01.jpg')
+    assert index.match(banner)[0] == 'a' * 64
+
+    # Close enough to dedup within a product, not close enough to drop across products
+    tinted = hashes_of(product_shot((218, 60, 60)))
+    assert perceptual_hash.is_near_duplicate(banner, tinted)
+    assert index.match(tinted) is None
+    assert index.match(hashes_of(product_shot((60, 140, 60)))) is None
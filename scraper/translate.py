@@ -7,6 +7,11 @@ Usage:
     python3 translate.py                    # Translate untranslated rows in protocol_zero_variants.csv
     python3 translate.py --force            # Re-translate all rows
     python3 translate.py --input custom.csv # Translate specific CSV
+    python3 translate.py --stream           # Large CSVs: bounded memory, resumable
+
+Prompts go through a pluggable backend (translation_backends.py); Gemini is only
+configured when the first request needs it, so this module imports without an
+API key. See translate_benchmark.py for measuring throughput offline.
 """
 
 import os
@@ -14,10 +19,16 @@ import csv
 import json
 import time
 import re
-from typing import Dict, Optional
+import hashlib
+import threading
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
 from pathlib import Path
 from dotenv import load_dotenv
-import google.generativeai as genai
+from translation_cache import TranslationCache
+from glossary import resolve_title, resolve_variant
+from translation_backends import GeminiBackend, TranslationBackend
 
 # Load environment variables from root .env file
 root_dir = Path(__file__).parent.parent
@@ -27,44 +38,27 @@ load_dotenv(dotenv_path=root_dir / '.env')
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Model priority: gemini-2.5-pro -> gemini-2.5-flash -> gemini-2.0-flash
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
-CACHE_FILE = Path("translation_cache.json")
+CACHE_FILE = Path("translation_cache.jsonl")
+LEGACY_CACHE_FILE = Path("translation_cache.json")  # Imported once into CACHE_FILE
 DEFAULT_CSV = Path("protocol_zero_variants.csv")
-
-# Initialize Gemini
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in .env file")
-
-genai.configure(api_key=GEMINI_API_KEY)
+BATCH_SIZE = {'title': 20, 'variant': 50}  # Strings packed into one JSON request
+MAX_BATCH_TOKENS = 6000  # Rough prompt budget per request
+CONCURRENT_REQUESTS = 4  # Batches in flight at once (still bounded by the rate limiter)
+WINDOW_ROWS = 500  # --stream: rows translated and flushed per window
+# Published free-tier limits (requests/min, tokens/min); adjust for paid plans
+MODEL_LIMITS = {
+    "gemini-2.5-pro": (5, 250_000),
+    "gemini-2.5-flash": (10, 250_000),
+    "gemini-2.0-flash": (15, 1_000_000),
+}
+DEFAULT_LIMITS = (5, 250_000)
 
 # Model priority: gemini-2.5-pro -> gemini-2.5-flash -> gemini-2.0-flash
 FALLBACK_MODELS = ["gemini-2.5-flash", "gemini-2.0-flash"]
-current_model_index = 0
 all_models = [GEMINI_MODEL] + FALLBACK_MODELS
 
-# Initialize first model
-model = genai.GenerativeModel(all_models[current_model_index])
-print(f"✅ Using model: {all_models[current_model_index]}")
-
-def get_current_model():
-    """Get the current model instance."""
-    return model
-
-def switch_to_next_model():
-    """Switch to the next fallback model if quota is exceeded."""
-    global model, current_model_index
-    if current_model_index < len(all_models) - 1:
-        current_model_index += 1
-        model = genai.GenerativeModel(all_models[current_model_index])
-        print(f"   🔄 Switched to fallback model: {all_models[current_model_index]}")
-        return True
-    return False
-
-# Translation prompt template
-TRANSLATION_PROMPT = """You are an expert translator specializing in airsoft and military equipment terminology.
-
-Translate the following Chinese product title into English. Follow these rules:
-
-1. REMOVE ALL BRAND NAMES (e.g., WOSPORT, FMA, TMC, Emerson, Condor, 5.11, etc.) - this is a private label shop
+# Translation rules, shared by the single-string and batch prompts
+TITLE_RULES = """1. REMOVE ALL BRAND NAMES (e.g., WOSPORT, FMA, TMC, Emerson, Condor, 5.11, etc.) - this is a private label shop
 
 2. REMOVE PROPRIETARY MODEL NUMBERS that are brand-specific alphanumeric codes:
    - Remove: L4G24, HLD-2, TB-FMA-0023, etc. (these are manufacturer SKUs)
@@ -86,19 +80,10 @@ Translate the following Chinese product title into English. Follow these rules:
 
 7. Be concise and suitable for e-commerce product listings
 
-8. DO NOT add extra explanations, just return the translated title
+8. DO NOT add extra explanations, just return the translated title"""
 
-Chinese Title: {title_zh}
-
-English Translation:"""
-
-# Variant name translation prompt (simpler - usually just colors/sizes)
-VARIANT_PROMPT = """You are an expert translator specializing in airsoft and military equipment terminology.
-
-Translate the following Chinese variant/option name into English. This is usually a color, size, or material option.
-
-Rules:
-1. Translate ALL Chinese text to English - do not leave any Chinese characters
+# Variant name rules (simpler - usually just colors/sizes)
+VARIANT_RULES = """1. Translate ALL Chinese text to English - do not leave any Chinese characters
 2. Keep standard color names: Black, Tan, OD Green, Coyote Brown, Wolf Gray, etc.
 3. Keep standard sizes: Small, Medium, Large, etc.
 4. Keep material names: Aluminum, Steel, Nylon, Cordura, etc.
@@ -112,12 +97,207 @@ Examples:
 - "金属泥色" -> "Metal Tan"
 - "【考度拉】狼棕色 CB" -> "Cordura Coyote Brown"
 - "BK黑色（除雾器）" -> "Black (Anti-Fog Device)"
-- "三块镜片" -> "Three Lenses"
+- "三块镜片" -> "Three Lenses\""""
+
+# Translation prompt template
+TRANSLATION_PROMPT = """You are an expert translator specializing in airsoft and military equipment terminology.
+
+Translate the following Chinese product title into English. Follow these rules:
+
+""" + TITLE_RULES + """
+
+Chinese Title: {title_zh}
+
+English Translation:"""
+
+# Variant name translation prompt (simpler - usually just colors/sizes)
+VARIANT_PROMPT = """You are an expert translator specializing in airsoft and military equipment terminology.
+
+Translate the following Chinese variant/option name into English. This is usually a color, size, or material option.
+
+Rules:
+""" + VARIANT_RULES + """
 
 Chinese Variant Name: {variant_zh}
 
 English Translation:"""
 
+# Cached translations are tied to the rules that produced them: editing TITLE_RULES
+# only invalidates cached titles, editing VARIANT_RULES only cached variants
+PROMPT_VERSIONS = {
+    'title': hashlib.sha256(TITLE_RULES.encode('utf-8')).hexdigest()[:8],
+    'variant': hashlib.sha256(VARIANT_RULES.encode('utf-8')).hexdigest()[:8],
+}
+
+# Batch prompts: many strings per request, answered as one JSON object
+BATCH_TRANSLATION_PROMPT = """You are an expert translator specializing in airsoft and military equipment terminology.
+
+Translate each of the following Chinese product titles into English. Follow these rules for every title:
+
+""" + TITLE_RULES + """
+
+Return ONLY a JSON object mapping each Chinese title, copied exactly as given, to its English translation.
+
+Chinese Titles (JSON array):
+{items_json}"""
+
+BATCH_VARIANT_PROMPT = """You are an expert translator specializing in airsoft and military equipment terminology.
+
+Translate each of the following Chinese variant/option names into English. These are usually color, size, or material options.
+
+Rules:
+""" + VARIANT_RULES + """
+
+Return ONLY a JSON object mapping each Chinese variant name, copied exactly as given, to its English translation.
+
+Chinese Variant Names (JSON array):
+{items_json}"""
+
+
+class RateLimiter:
+    """Token bucket over one model's requests/minute and tokens/minute."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+        self._updated = now
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """Take one request and `tokens` tokens if they fit; else return seconds until they would."""
+        tokens = min(tokens, self.tpm)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._requests >= 1 and self._tokens >= tokens:
+                self._requests -= 1
+                self._tokens -= tokens
+                return 0.0
+            return max((1 - self._requests) * 60 / self.rpm,
+                       (tokens - self._tokens) * 60 / self.tpm, 0.05)
+
+
+class ModelScheduler:
+    """
+    Routes each request to the most preferred model that has quota right now.
+
+    Every model keeps its own rate limiter, a cooldown set by 429 responses and a
+    daily-quota flag. Work goes to gemini-2.5-pro whenever its per-minute window
+    allows and spills over to the fallbacks only while it is busy or cooling down,
+    so concurrent batches keep several models busy and return to the preferred
+    model as soon as its window resets.
+    """
+
+    def __init__(self, models: List[str]):
+        self.models = list(models)
+        self.limiters = {name: RateLimiter(*MODEL_LIMITS.get(name, DEFAULT_LIMITS)) for name in self.models}
+        self.cooldown_until = {name: 0.0 for name in self.models}
+        self.exhausted = set()
+        self.requests = {name: 0 for name in self.models}
+        self.waited = 0.0  # Seconds spent blocked, for reporting
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> Optional[str]:
+        """Block until some model can take a request; return its name (None if all are exhausted)."""
+        while True:
+            soonest = None
+            now = time.monotonic()
+            for name in self.models:
+                with self._lock:
+                    if name in self.exhausted:
+                        continue
+                    cooldown = self.cooldown_until[name] - now
+                if cooldown > 0:
+                    wait = cooldown
+                else:
+                    wait = self.limiters[name].try_acquire(tokens)
+                    if wait == 0:
+                        with self._lock:
+                            self.requests[name] += 1
+                        return name
+                soonest = wait if soonest is None else min(soonest, wait)
+            if soonest is None:
+                return None
+            with self._lock:
+                self.waited += soonest
+            time.sleep(soonest)
+
+    def cool_down(self, name: str, seconds: float):
+        """Per-minute limit hit: keep requests off this model for `seconds`."""
+        with self._lock:
+            self.cooldown_until[name] = max(self.cooldown_until[name], time.monotonic() + seconds)
+        print(f"   ⏸️  {name} rate limited, routing to other models for {seconds:.0f}s")
+
+    def mark_exhausted(self, name: str):
+        """Daily quota hit: stop using this model for the rest of the run."""
+        with self._lock:
+            if name in self.exhausted:
+                return
+            self.exhausted.add(name)
+            remaining = [m for m in self.models if m not in self.exhausted]
+        if remaining:
+            print(f"   🔄 Daily quota exceeded for {name}, continuing with: {', '.join(remaining)}")
+        else:
+            print(f"   ⚠️  Daily quota exceeded for all models. Quota resets daily.")
+            print(f"   💡 Options: 1) Wait for quota reset, 2) Upgrade API plan, 3) Continue tomorrow")
+
+    def summary(self) -> str:
+        used = ', '.join(f"{name}: {count}" for name, count in self.requests.items())
+        return f"Requests per model: {used}; {self.waited:.1f}s spent waiting for quota (summed across workers)"
+
+
+scheduler = ModelScheduler(all_models)
+# Where translations come from: {'cached', 'glossary', 'api'} counts of unique strings
+STATS = {'cached': 0, 'glossary': 0, 'api': 0}
+_backend: Optional[TranslationBackend] = None
+
+
+def get_backend() -> TranslationBackend:
+    """The active backend; Gemini is configured on first use (needs GEMINI_API_KEY)."""
+    global _backend
+    if _backend is None:
+        _backend = GeminiBackend(GEMINI_API_KEY)
+        print(f"✅ Using models (in priority order): {', '.join(all_models)}")
+    return _backend
+
+
+def set_backend(backend: TranslationBackend):
+    """Swap in another backend (e.g. translation_backends.FakeBackend for benchmarks)."""
+    global _backend
+    _backend = backend
+
+
+def classify_error(error: Exception) -> str:
+    """'daily', 'rate', 'not_found' or 'other' for a Gemini API exception."""
+    error_str = str(error)
+    lower = error_str.lower()
+    if "429" in error_str or "quota" in lower or "rate limit" in lower:
+        if "per day" in lower or "daily" in lower or "limit: 50" in error_str:
+            return 'daily'
+        return 'rate'
+    if "404" in error_str or "not found" in lower:
+        return 'not_found'
+    return 'other'
+
+
+def retry_delay(error: Exception, attempt: int) -> int:
+    """Retry delay suggested by a rate-limit error, or 60s, 120s, 180s..."""
+    delay_match = re.search(r'retry.*?(\d+)', str(error), re.IGNORECASE)
+    return int(delay_match.group(1)) if delay_match else 60 * (attempt + 1)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (CJK is ~1 token per character, English ~4 characters per token)."""
+    cjk = len(re.findall(r'[\u4e00-\u9fff]', text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
 
 def contains_chinese(text: str) -> bool:
     """Check if text contains Chinese characters."""
@@ -125,24 +305,12 @@ def contains_chinese(text: str) -> bool:
     return bool(chinese_pattern.search(text))
 
 
-def load_cache() -> Dict[str, str]:
-    """Load translation cache from JSON file."""
-    if CACHE_FILE.exists():
-        try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"⚠️  Warning: Could not load cache: {e}")
-    return {}
-
-
-def save_cache(cache: Dict[str, str]):
-    """Save translation cache to JSON file."""
-    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+def load_cache() -> TranslationCache:
+    """Load the append-only translation cache (importing the old JSON cache once)."""
+    return TranslationCache(CACHE_FILE, PROMPT_VERSIONS, legacy_path=LEGACY_CACHE_FILE)
 
 
-def translate_with_gemini(text_zh: str, cache: Dict[str, str], is_variant: bool = False, max_retries: int = 3) -> str:
+def translate_with_gemini(text_zh: str, cache: TranslationCache, is_variant: bool = False, max_retries: int = 3) -> str:
     """
     Translate Chinese text to English using Gemini.
     Uses cache to avoid re-translating.
@@ -151,157 +319,214 @@ def translate_with_gemini(text_zh: str, cache: Dict[str, str], is_variant: bool
     
     Args:
         text_zh: Chinese text to translate
-        cache: Translation cache dictionary
+        cache: Translation cache
         is_variant: If True, use variant prompt (simpler), else use product title prompt
         max_retries: Maximum number of retry attempts for rate limit errors
     """
-    global model, current_model_index, all_models
-    # Check cache first (use a prefix to distinguish product titles from variants)
-    cache_key = f"variant:{text_zh}" if is_variant else text_zh
-    if cache_key in cache:
-        return cache[cache_key]
-    
-    # Translate with Gemini (with retry logic for rate limits)
-    for attempt in range(max_retries):
+    # Check cache first (titles and variants are cached separately)
+    cached = cache.get(text_zh, is_variant)
+    if cached is not None:
+        return cached
+    
+    if is_variant:
+        prompt = VARIANT_PROMPT.format(variant_zh=text_zh)
+    else:
+        prompt = TRANSLATION_PROMPT.format(title_zh=text_zh)
+    
+    # Translate with Gemini; rate limits and daily quotas are routed around by the scheduler
+    attempt = 0
+    while attempt < max_retries:
+        model_name = scheduler.acquire(estimate_tokens(prompt) + 50)
+        if model_name is None:
+            print(f"   ⚠️  No model has quota left for '{text_zh[:50]}...'")
+            return text_zh  # Return original - no more models to try
         try:
-            if is_variant:
-                prompt = VARIANT_PROMPT.format(variant_zh=text_zh)
-            else:
-                prompt = TRANSLATION_PROMPT.format(title_zh=text_zh)
-            
-            response = model.generate_content(prompt)
-            text_en = response.text.strip()
+            text_en = get_backend().generate(model_name, prompt).strip()
             
             # Clean up any markdown or extra formatting
             text_en = text_en.replace('**', '').replace('*', '').strip()
             
             # Cache the result
-            cache[cache_key] = text_en
-            save_cache(cache)
+            cache.put(text_zh, is_variant, text_en, model_name)
             
             return text_en
         
         except Exception as e:
-            error_str = str(e)
-            
-            # Check for quota/rate limit errors
-            if "429" in error_str or "quota" in error_str.lower() or "rate limit" in error_str.lower():
-                # Check if it's a daily quota (won't reset with retry)
-                if "per day" in error_str.lower() or "daily" in error_str.lower() or "limit: 50" in error_str:
-                    # Try switching to next model if available
-                    if switch_to_next_model():
-                        print(f"   🔄 Retrying with fallback model...")
-                        continue  # Retry with new model
-                    else:
-                        print(f"   ⚠️  Daily quota exceeded for '{text_zh[:50]}...'")
-                        print(f"   💡 All models have exceeded quota. Quota resets daily.")
-                        print(f"   💡 Options: 1) Wait for quota reset, 2) Upgrade API plan, 3) Continue tomorrow")
-                        return text_zh  # Return original - no more models to try
-                
-                # Rate limit (temporary) - can retry
-                if attempt < max_retries - 1:
-                    # Extract retry delay if available
-                    import re
-                    delay_match = re.search(r'retry.*?(\d+)', error_str, re.IGNORECASE)
-                    delay = int(delay_match.group(1)) if delay_match else (60 * (attempt + 1))  # Default: 60s, 120s, 180s
-                    
-                    print(f"   ⏸️  Rate limit exceeded. Waiting {delay}s before retry {attempt + 1}/{max_retries}...")
-                    time.sleep(delay)
+            kind = classify_error(e)
+            if kind == 'daily':
+                # Won't reset with a retry; doesn't count as an attempt
+                scheduler.mark_exhausted(model_name)
+                continue
+            attempt += 1
+            if kind == 'rate':
+                scheduler.cool_down(model_name, retry_delay(e, attempt - 1))
+                if attempt < max_retries:
                     continue
-                else:
-                    print(f"❌ Translation failed after {max_retries} retries (rate limit): '{text_zh[:50]}...'")
-                    return text_zh  # Return original if all retries fail
-            elif "404" in error_str or "not found" in error_str.lower():
-                # Model not found - could be intermittent, retry once
-                if attempt < max_retries - 1:
-                    print(f"   ⚠️  API error (404) for '{text_zh[:50]}...', retrying...")
+                print(f"❌ Translation failed after {max_retries} retries (rate limit): '{text_zh[:50]}...'")
+                return text_zh  # Return original if all retries fail
+            elif kind == 'not_found':
+                # Model not found - could be intermittent, retry
+                if attempt < max_retries:
+                    print(f"   ⚠️  API error (404) on {model_name} for '{text_zh[:50]}...', retrying...")
                     time.sleep(2)  # Short delay before retry
                     continue
-                else:
-                    print(f"❌ Model/API error after retries: '{text_zh[:50]}...'")
-                    print(f"   💡 This might be a temporary API issue. The variant will keep its current translation.")
-                    return text_zh
+                print(f"❌ Model/API error after retries: '{text_zh[:50]}...'")
+                print(f"   💡 This might be a temporary API issue. The variant will keep its current translation.")
+                return text_zh
             else:
                 # Other errors - don't retry
                 print(f"❌ Translation error for '{text_zh[:50]}...': {e}")
                 return text_zh  # Return original if translation fails
     
-    # Should never reach here, but just in case
     return text_zh
 
 
-def translate_csv(input_csv: Path, force: bool = False):
+def translate_batch(texts: List[str], is_variant: bool = False):
     """
-    Translate all Chinese titles and variant names in CSV file.
-    Updates the 'Translated Title' and 'Translated Option Name' columns.
+    Translate several strings with one structured-JSON request.
+
+    Safe to call from worker threads: it never touches the cache. Returns
+    (model_name, translations) with only the translations the model gave back for
+    the requested strings; anything missing (or the whole batch, on error) is left
+    for translate_with_gemini to retry.
     """
-    if not input_csv.exists():
-        print(f"❌ Error: CSV file not found: {input_csv}")
-        return
-    
-    print(f"📄 Reading CSV: {input_csv}")
+    template = BATCH_VARIANT_PROMPT if is_variant else BATCH_TRANSLATION_PROMPT
+    prompt = template.format(items_json=json.dumps(texts, ensure_ascii=False, indent=0))
+    tokens = estimate_tokens(prompt) + 30 * len(texts)
+    attempt = 0
+    while True:
+        model_name = scheduler.acquire(tokens)
+        if model_name is None:
+            return None, {}
+        try:
+            result = json.loads(get_backend().generate(model_name, prompt, json_output=True))
+            break
+        except Exception as e:
+            kind = classify_error(e)
+            if kind == 'daily':
+                scheduler.mark_exhausted(model_name)
+                continue
+            if kind == 'rate' and attempt < 2:
+                # Another model (or this one, once its window resets) picks the batch up
+                scheduler.cool_down(model_name, retry_delay(e, attempt))
+                attempt += 1
+                continue
+            print(f"   ⚠️  Batch of {len(texts)} failed on {model_name}, will retry one by one: {str(e)[:120]}")
+            return model_name, {}
     
-    # Load cache
-    cache = load_cache()
-    print(f"💾 Loaded {len(cache)} cached translations")
+    translations = {}
+    if isinstance(result, dict):
+        for text_zh in texts:
+            text_en = result.get(text_zh)
+            if isinstance(text_en, str) and text_en.strip():
+                translations[text_zh] = text_en.replace('**', '').replace('*', '').strip()
+    return model_name, translations
+
+
+def make_batches(texts: List[str], batch_size: int) -> List[List[str]]:
+    """Split texts into batches bounded by count and by MAX_BATCH_TOKENS."""
+    batches, current, current_tokens = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= batch_size or current_tokens + tokens > MAX_BATCH_TOKENS):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_many(texts: List[str], cache: TranslationCache, is_variant: bool = False) -> Dict[str, str]:
+    """
+    Translate a list of strings: dedupe, serve from cache, resolve what the offline
+    glossary fully covers, then send the rest as concurrent JSON batches.
+    Returns {chinese: english} for every input string.
+    """
+    unique = list(dict.fromkeys(t for t in texts if t))
+    kind = 'variant' if is_variant else 'title'
+    resolve = resolve_variant if is_variant else resolve_title
+    offline = {}
+    for text_zh in unique:
+        if cache.get(text_zh, is_variant) is None:
+            text_en = resolve(text_zh)
+            if text_en:
+                offline[text_zh] = text_en
+    if offline:
+        print(f"   📖 {len(offline)} {kind}(s) resolved by the glossary (no API call)")
+    pending = [t for t in unique if t not in offline and cache.get(t, is_variant) is None]
+    STATS['cached'] += len(unique) - len(pending) - len(offline)
+    STATS['glossary'] += len(offline)
+    STATS['api'] += len(pending)
     
-    # Read CSV
-    with open(input_csv, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-        fieldnames = list(reader.fieldnames)
+    if pending:
+        batches = make_batches(pending, BATCH_SIZE[kind])
+        print(f"   📦 {len(pending)} unique {kind}s to translate in {len(batches)} batch request(s) "
+              f"({len(unique) - len(pending) - len(offline)} cached)")
+        with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as pool:
+            futures = {pool.submit(translate_batch, batch, is_variant): batch for batch in batches}
+            for done, future in enumerate(as_completed(futures), 1):
+                batch = futures[future]
+                model_name, translations = future.result()
+                for text_zh, text_en in translations.items():
+                    cache.put(text_zh, is_variant, text_en, model_name)
+                print(f"   ✅ Batch {done}/{len(batches)}: {len(translations)}/{len(batch)} {kind}s translated")
+        
+        # Anything a batch dropped goes through the single-string path (with its retry logic)
+        for text_zh in pending:
+            if cache.get(text_zh, is_variant) is None:
+                translate_with_gemini(text_zh, cache, is_variant=is_variant)
     
-    if 'Product Title ZH' not in fieldnames:
-        print("❌ Error: CSV missing 'Product Title ZH' column")
-        return
+    return {t: offline.get(t) or cache.get(t, is_variant) or t for t in unique}
+
+
+def output_fieldnames(fieldnames: List[str]) -> List[str]:
+    """Input CSV columns plus the translation columns, inserted next to their source."""
+    fieldnames = list(fieldnames)
     
     # Add 'Translated Title' column if missing
     if 'Translated Title' not in fieldnames:
         print("⚠️  Warning: 'Translated Title' column not found, will add it")
         fieldnames.insert(fieldnames.index('Product Title ZH') + 1, 'Translated Title')
-        for row in rows:
-            row['Translated Title'] = ''
     
     # Add 'Translated Option Name' column if missing (for variants)
     if 'Option Name ZH' in fieldnames and 'Translated Option Name' not in fieldnames:
         print("⚠️  Warning: 'Translated Option Name' column not found, will add it")
         option_zh_idx = fieldnames.index('Option Name ZH')
         fieldnames.insert(option_zh_idx + 1, 'Translated Option Name')
-        for row in rows:
-            row['Translated Option Name'] = ''
-    
-    # Translate rows
-    translated_titles = 0
-    translated_variants = 0
-    skipped_count = 0
+    return fieldnames
+
+
+def translate_rows(rows: List[Dict], cache: TranslationCache, force: bool = False,
+                   forced: Optional[set] = None, first_row: int = 1) -> Dict[str, int]:
+    """
+    Fill 'Translated Title' / 'Translated Option Name' for a list of rows in place.
+    Returns counts of translated titles, translated variants and skipped rows.
     
-    print(f"\n🌐 Translating {len(rows)} rows (products and variants)...")
+    forced remembers which strings force mode already dropped from the cache, so
+    a title repeated in a later window is not re-translated again.
+    """
+    counts = {'titles': 0, 'variants': 0, 'skipped': 0}
+    forced = forced if forced is not None else set()
     
-    for i, row in enumerate(rows, 1):
-        # Translate product title
+    # Collect everything that needs translating first; every product title repeats
+    # on each of its variant rows, so the distinct set is much smaller
+    title_rows = []
+    variant_rows = []
+    for i, row in enumerate(rows, first_row):
         title_zh = row.get('Product Title ZH', '').strip()
-        title_en = row.get('Translated Title', '').strip()
+        title_en = (row.get('Translated Title') or '').strip()
         
         if title_zh:
             if not title_en or force:
-                print(f"  [{i}/{len(rows)}] 🔄 Translating product: {title_zh[:50]}...")
-                title_en = translate_with_gemini(title_zh, cache, is_variant=False)
-                row['Translated Title'] = title_en
-                print(f"              ✅ Product: {title_en[:60]}...")
-                translated_titles += 1
-                
-                # Rate limiting
-                if translated_titles % 10 == 0:
-                    print("    ⏸️  Pausing 5s to respect rate limits...")
-                    time.sleep(5)
-                else:
-                    time.sleep(0.5)
+                title_rows.append(row)
             else:
-                skipped_count += 1
+                counts['skipped'] += 1
         
         # Translate variant name (Option Name ZH)
-        variant_zh = row.get('Option Name ZH', '').strip()
-        variant_en = row.get('Translated Option Name', '').strip()
+        variant_zh = (row.get('Option Name ZH') or '').strip()
+        variant_en = (row.get('Translated Option Name') or '').strip()
         
         if variant_zh:
             # Check if translation is needed:
@@ -315,38 +540,175 @@ def translate_csv(input_csv: Path, force: bool = False):
             )
             
             if needs_translation:
-                if contains_chinese(variant_en):
-                    print(f"              🔄 Re-translating (still has Chinese): {variant_zh[:40]}...")
-                else:
-                    print(f"              🔄 Translating variant: {variant_zh[:40]}...")
-                variant_en = translate_with_gemini(variant_zh, cache, is_variant=True)
-                row['Translated Option Name'] = variant_en
-                print(f"              ✅ Variant: {variant_en[:50]}...")
-                translated_variants += 1
-                
-                # Rate limiting (separate from product titles)
-                if translated_variants % 10 == 0:
-                    print("    ⏸️  Pausing 5s to respect rate limits...")
-                    time.sleep(5)
-                else:
-                    time.sleep(0.5)
+                variant_rows.append(row)
         elif not title_zh:
             # Skip row if both are empty
-            print(f"  [{i}/{len(rows)}] ⚠️  Empty row, skipping")
-            skipped_count += 1
+            print(f"  [row {i}] ⚠️  Empty row, skipping")
+            counts['skipped'] += 1
+    
+    if force:
+        # Force mode re-translates: drop cached answers for the affected strings (once per run)
+        for row in title_rows:
+            title_zh = row['Product Title ZH'].strip()
+            if ('title', title_zh) not in forced:
+                cache.discard(title_zh, is_variant=False)
+                forced.add(('title', title_zh))
+        for row in variant_rows:
+            variant_zh = row['Option Name ZH'].strip()
+            if ('variant', variant_zh) not in forced:
+                cache.discard(variant_zh, is_variant=True)
+                forced.add(('variant', variant_zh))
     
-    # Write updated CSV
+    if title_rows:
+        titles = translate_many([row['Product Title ZH'].strip() for row in title_rows], cache, is_variant=False)
+        for row in title_rows:
+            row['Translated Title'] = titles[row['Product Title ZH'].strip()]
+            counts['titles'] += 1
+    
+    if variant_rows:
+        variants = translate_many([row['Option Name ZH'].strip() for row in variant_rows], cache, is_variant=True)
+        for row in variant_rows:
+            row['Translated Option Name'] = variants[row['Option Name ZH'].strip()]
+            counts['variants'] += 1
+    return counts
+
+
+def print_summary(counts: Dict[str, int], cache: TranslationCache):
+    print(f"\n✅ Translation complete!")
+    print(f"   Translated products: {counts['titles']}")
+    print(f"   Translated variants: {counts['variants']}")
+    print(f"   Skipped: {counts['skipped']}")
+    print(f"   Total cache: {len(cache)} entries")
+    print(f"   {scheduler.summary()}")
+
+
+def translate_csv(input_csv: Path, force: bool = False):
+    """
+    Translate all Chinese titles and variant names in CSV file.
+    Updates the 'Translated Title' and 'Translated Option Name' columns.
+    """
+    if not input_csv.exists():
+        print(f"❌ Error: CSV file not found: {input_csv}")
+        return
+    
+    print(f"📄 Reading CSV: {input_csv}")
+    
+    # Load cache
+    cache = load_cache()
+    print(f"💾 Loaded {len(cache)} cached translations")
+    
+    # Read CSV
+    with open(input_csv, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        fieldnames = list(reader.fieldnames or [])
+    
+    if 'Product Title ZH' not in fieldnames:
+        print("❌ Error: CSV missing 'Product Title ZH' column")
+        return
+    fieldnames = output_fieldnames(fieldnames)
+    
+    print(f"\n🌐 Translating {len(rows)} rows (products and variants)...")
+    counts = translate_rows(rows, cache, force)
+    
+    # Write updated CSV (temp file + atomic swap)
     print(f"\n💾 Writing updated CSV...")
-    with open(input_csv, 'w', encoding='utf-8', newline='') as f:
+    tmp_path = input_csv.with_name(input_csv.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(rows)
+    os.replace(tmp_path, input_csv)
     
-    print(f"\n✅ Translation complete!")
-    print(f"   Translated products: {translated_titles}")
-    print(f"   Translated variants: {translated_variants}")
-    print(f"   Skipped: {skipped_count}")
-    print(f"   Total cache: {len(cache)} entries")
+    cache.close()
+    print_summary(counts, cache)
+
+
+def translate_csv_streaming(input_csv: Path, force: bool = False, window: int = WINDOW_ROWS):
+    """
+    Translate a CSV in bounded windows of rows without loading it into memory.
+    
+    Rows are read lazily, translated `window` at a time and appended to
+    <csv>.tmp, which replaces the input only once every row is done. After each
+    window the temp file is fsynced and <csv>.progress.json records how many rows
+    (and bytes) are safely written, so a restart resumes at the last flushed row.
+    """
+    if not input_csv.exists():
+        print(f"❌ Error: CSV file not found: {input_csv}")
+        return
+    
+    tmp_path = input_csv.with_name(input_csv.name + '.tmp')
+    progress_path = input_csv.with_name(input_csv.name + '.progress.json')
+    stat = input_csv.stat()
+    source = {'size': stat.st_size, 'mtime': stat.st_mtime, 'force': force}
+    
+    progress = None
+    if progress_path.exists() and tmp_path.exists():
+        try:
+            with open(progress_path, 'r', encoding='utf-8') as f:
+                progress = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not read {progress_path.name}, starting over: {e}")
+        if progress and progress.get('source') != source:
+            print(f"⚠️  {input_csv.name} changed since the interrupted run, starting over")
+            progress = None
+    
+    print(f"📄 Streaming CSV: {input_csv} (windows of {window} rows)")
+    cache = load_cache()
+    print(f"💾 Loaded {len(cache)} cached translations")
+    
+    counts = {'titles': 0, 'variants': 0, 'skipped': 0}
+    forced = set()
+    with open(input_csv, 'r', encoding='utf-8', newline='') as src:
+        reader = csv.DictReader(src)
+        fieldnames = list(reader.fieldnames or [])
+        if 'Product Title ZH' not in fieldnames:
+            print("❌ Error: CSV missing 'Product Title ZH' column")
+            return
+        fieldnames = output_fieldnames(fieldnames)
+        
+        if progress:
+            done = progress['rows']
+            # Drop anything written after the last checkpoint, then skip the rows already done
+            with open(tmp_path, 'r+b') as f:
+                f.truncate(progress['bytes'])
+            for _ in islice(reader, done):
+                pass
+            out = open(tmp_path, 'a', encoding='utf-8', newline='')
+            writer = csv.DictWriter(out, fieldnames=fieldnames)
+            print(f"⏯️  Resuming after row {done}")
+        else:
+            done = 0
+            out = open(tmp_path, 'w', encoding='utf-8', newline='')
+            writer = csv.DictWriter(out, fieldnames=fieldnames)
+            writer.writeheader()
+        
+        try:
+            while True:
+                rows = list(islice(reader, window))
+                if not rows:
+                    break
+                print(f"\n🌐 Rows {done + 1}-{done + len(rows)}...")
+                for key, value in translate_rows(rows, cache, force, forced, first_row=done + 1).items():
+                    counts[key] += value
+                writer.writerows(rows)
+                out.flush()
+                os.fsync(out.fileno())
+                done += len(rows)
+                
+                checkpoint = {'source': source, 'rows': done, 'bytes': os.path.getsize(tmp_path)}
+                with open(f"{progress_path}.tmp", 'w', encoding='utf-8') as f:
+                    json.dump(checkpoint, f)
+                os.replace(f"{progress_path}.tmp", progress_path)
+        finally:
+            out.close()
+    
+    os.replace(tmp_path, input_csv)
+    progress_path.unlink(missing_ok=True)
+    print(f"\n💾 Wrote {done} rows to {input_csv}")
+    
+    cache.close()
+    print_summary(counts, cache)
 
 
 def main():
@@ -357,13 +719,21 @@ def main():
                         help=f"Input CSV file (default: {DEFAULT_CSV})")
     parser.add_argument('--force', action='store_true',
                         help="Re-translate all rows (ignore existing translations)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Process the CSV in windows with constant memory; resumes after a crash")
+    parser.add_argument('--window', type=int, default=WINDOW_ROWS,
+                        help=f"Rows per window in --stream mode (default: {WINDOW_ROWS})")
     
     args = parser.parse_args()
     
     print("🤖 Protocol Zero - Gemini Translation Tool")
     print("=" * 60)
     
-    translate_csv(args.input, force=args.force)
+    get_backend()  # Fail fast if GEMINI_API_KEY is missing
+    if args.stream:
+        translate_csv_streaming(args.input, force=args.force, window=max(1, args.window))
+    else:
+        translate_csv(args.input, force=args.force)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Measure translate.py throughput without spending Gemini quota.
+
+Runs translate_csv() on a copy of a CSV, with its translation columns cleared
+so every row goes to the backend or the cache, against translation_backends.FakeBackend
+(simulated latency, random 429s, per-model daily quotas) and reports rows/sec,
+API calls, cache hit rate and time spent waiting for quota. The first run starts
+with an empty cache; later runs reuse it to show warm-cache behaviour.
+
+Usage:
+    python3 translate_benchmark.py                              # protocol_zero_variants.csv, 2 runs
+    python3 translate_benchmark.py --input big.csv --runs 1
+    python3 translate_benchmark.py --rate-limit-rate 0.1 --daily-quota 50
+    python3 translate_benchmark.py --rpm 1000                   # Ignore free-tier limits
+"""
+
+import argparse
+import csv
+import tempfile
+import time
+from pathlib import Path
+
+import translate
+from translation_backends import FakeBackend
+
+# Columns translate_csv() fills; cleared in the working copy so rows aren't skipped as done
+OUTPUT_COLUMNS = ('Translated Title', 'Translated Option Name')
+
+
+def untranslated_copy(csv_path: Path, target: Path) -> int:
+    """Copy csv_path to target with OUTPUT_COLUMNS emptied; returns the row count."""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        rows = list(reader)
+    for row in rows:
+        for column in OUTPUT_COLUMNS:
+            if column in row:
+                row[column] = ''
+    with open(target, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
+
+
+def run_once(csv_path: Path, work_dir: Path, run: int, backend: FakeBackend):
+    """Translate a fresh, untranslated copy of csv_path and return the measurements."""
+    target = work_dir / f"run_{run}.csv"
+    rows = untranslated_copy(csv_path, target)
+
+    translate.scheduler = translate.ModelScheduler(translate.all_models)
+    for key in translate.STATS:
+        translate.STATS[key] = 0
+    calls_before = backend.total_calls
+
+    start = time.monotonic()
+    translate.translate_csv(target)
+    elapsed = time.monotonic() - start
+
+    lookups = sum(translate.STATS.values())
+    return {
+        'rows': rows,
+        'seconds': elapsed,
+        'rows_per_sec': rows / elapsed if elapsed else 0.0,
+        'api_calls': backend.total_calls - calls_before,
+        'cache_hit_rate': translate.STATS['cached'] / lookups * 100 if lookups else 0.0,
+        'glossary': translate.STATS['glossary'],
+        'waited': translate.scheduler.waited,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark translate.py against a fake Gemini backend")
+    parser.add_argument('--input', type=Path, default=translate.DEFAULT_CSV,
+                        help=f"CSV to translate (default: {translate.DEFAULT_CSV})")
+    parser.add_argument('--runs', type=int, default=2,
+                        help="Number of runs; the cache is kept between runs (default: 2)")
+    parser.add_argument('--latency', type=float, default=0.8,
+                        help="Simulated seconds per API call (default: 0.8)")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help="Probability of a simulated per-minute 429 (default: 0)")
+    parser.add_argument('--daily-quota', type=int, default=None,
+                        help="Simulated requests/day per model before quota errors (default: unlimited)")
+    parser.add_argument('--rpm', type=int, default=None,
+                        help="Override every model's requests/minute limit (default: MODEL_LIMITS)")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ Error: CSV file not found: {args.input}")
+        return
+
+    if args.rpm:
+        for name in translate.all_models:
+            translate.MODEL_LIMITS[name] = (args.rpm, translate.MODEL_LIMITS.get(name, translate.DEFAULT_LIMITS)[1])
+
+    daily = {name: args.daily_quota for name in translate.all_models} if args.daily_quota else None
+    backend = FakeBackend(latency=args.latency, rate_limit_rate=args.rate_limit_rate, daily_quota=daily)
+    translate.set_backend(backend)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='translate-bench-') as tmp:
+        work_dir = Path(tmp)
+        translate.CACHE_FILE = work_dir / 'translation_cache.jsonl'
+        translate.LEGACY_CACHE_FILE = work_dir / 'none.json'
+        for run in range(1, args.runs + 1):
+            print(f"\n{'=' * 60}\n⏱️  Run {run}/{args.runs} ({'cold' if run == 1 else 'warm'} cache)\n{'=' * 60}")
+            results.append(run_once(args.input, work_dir, run, backend))
+
+    print(f"\n📊 Benchmark results ({args.input}, latency {args.latency}s, "
+          f"429 rate {args.rate_limit_rate:.0%}, daily quota {args.daily_quota or 'unlimited'})")
+    for run, r in enumerate(results, 1):
+        print(f"   Run {run}: {r['rows']} rows in {r['seconds']:.1f}s ({r['rows_per_sec']:.1f} rows/s), "
+              f"{r['api_calls']} API calls, cache hit rate {r['cache_hit_rate']:.0f}%, "
+              f"{r['glossary']} glossary hits, {r['waited']:.1f}s waiting for quota")
+    print(f"   Calls per model: {backend.calls}")
+    print(f"   Simulated errors: {backend.errors['rate']} rate limits, {backend.errors['daily']} daily quota")
+
+
+if __name__ == "__main__":
+    main()
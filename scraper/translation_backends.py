@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Backends that translate.py sends prompts to.
+
+A backend only has to implement generate(model_name, prompt, json_output) and
+return the response text; errors are raised as exceptions whose message looks
+like the Gemini API's ("429 ... retry in 12s", "... quota ... per day"), which
+is what translate.classify_error() understands.
+
+- GeminiBackend: the real API. google.generativeai is imported and configured
+  only when the backend is created, so translate.py can be imported without it.
+- FakeBackend: a local stand-in with configurable latency, random 429s and a
+  per-model daily quota, used by translate_benchmark.py.
+"""
+
+import json
+import random
+from abc import ABC, abstractmethod
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TranslationBackend(ABC):
+    """Interface: send one prompt to one model and return the response text."""
+
+    name = 'base'
+
+    @abstractmethod
+    def generate(self, model_name: str, prompt: str, json_output: bool = False) -> str:
+        """Response text for prompt from model_name (JSON text when json_output)."""
+
+
+class GeminiBackend(TranslationBackend):
+    """Google Gemini via google.generativeai."""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: Optional[str]):
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in .env file")
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _model(self, name: str):
+        with self._lock:
+            if name not in self._models:
+                self._models[name] = self._genai.GenerativeModel(name)
+            return self._models[name]
+
+    def generate(self, model_name: str, prompt: str, json_output: bool = False) -> str:
+        if json_output:
+            response = self._model(model_name).generate_content(
+                prompt, generation_config={"response_mime_type": "application/json"}
+            )
+        else:
+            response = self._model(model_name).generate_content(prompt)
+        return response.text
+
+
+class FakeBackend(TranslationBackend):
+    """
+    Offline stand-in for Gemini. Translates "X" to "EN(X)" after a simulated
+    latency, raises a per-minute 429 with probability rate_limit_rate, and a
+    daily-quota error once a model has served daily_quota requests.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency: float = 0.8, jitter: float = 0.3, rate_limit_rate: float = 0.0,
+                 daily_quota: Optional[Dict[str, int]] = None, retry_after: int = 5, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.daily_quota = daily_quota or {}
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.errors = {'rate': 0, 'daily': 0}
+
+    def generate(self, model_name: str, prompt: str, json_output: bool = False) -> str:
+        with self._lock:
+            served = self.calls.get(model_name, 0)
+            self.calls[model_name] = served + 1
+            roll = self._random.random()
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+
+        quota = self.daily_quota.get(model_name)
+        if quota is not None and served >= quota:
+            with self._lock:
+                self.errors['daily'] += 1
+            raise RuntimeError(f"429 Quota exceeded for metric: generate_content requests per day, "
+                               f"limit: {quota}, model: {model_name}")
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.errors['rate'] += 1
+            raise RuntimeError(f"429 Resource has been exhausted (rate limit). Please retry in {self.retry_after}s")
+
+        if json_output:
+            items = json.loads(prompt.rsplit('(JSON array):', 1)[1])
+            return json.dumps({item: f"EN({item})" for item in items}, ensure_ascii=False)
+        source = prompt.rsplit(':', 2)[-2].strip().splitlines()[0]
+        return f"EN({source})"
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
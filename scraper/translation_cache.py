@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Append-only translation cache for translate.py.
+
+Every insert is a single JSON line appended to translation_cache.jsonl, so a
+write costs O(1) and a crash can at worst leave one truncated last line, which
+is dropped on load. Entries are keyed by kind (title/variant), prompt version
+and the Chinese text; the model that produced a translation is stored with it.
+Changing the title rules therefore invalidates cached titles but not variants.
+
+The log is compacted (live entries rewritten to a temp file and swapped in
+atomically) when it holds more dead lines than live ones.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+SYNC_EVERY = 20  # fsync the log after this many appends; close() syncs the rest
+MIN_COMPACT_LINES = 100  # Don't bother compacting tiny logs
+
+
+class TranslationCache:
+    """Translations keyed by (kind, prompt version, text), backed by a JSONL log."""
+
+    def __init__(self, path: Path, prompt_versions: Dict[str, str], legacy_path: Optional[Path] = None):
+        self.path = Path(path)
+        self.prompt_versions = prompt_versions
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._log_lines = 0
+        self._unsynced = 0
+        self._file = None
+
+        if self.path.exists():
+            self._load()
+        elif legacy_path is not None and Path(legacy_path).exists():
+            self._import_legacy(Path(legacy_path))
+        if self._log_lines - len(self.entries) > max(MIN_COMPACT_LINES, len(self.entries)):
+            self.compact()
+
+    def key(self, text_zh: str, is_variant: bool = False) -> str:
+        kind = 'variant' if is_variant else 'title'
+        return f"{kind}:{self.prompt_versions[kind]}:{text_zh}"
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        if data and not data.endswith(b'\n'):
+            # Interrupted append: drop the partial last line so new appends start clean
+            data = data[:data.rfind(b'\n') + 1]
+            with open(self.path, 'r+b') as f:
+                f.truncate(len(data))
+        for line in data.decode('utf-8', errors='replace').splitlines():
+            self._log_lines += 1
+            try:
+                record = json.loads(line)
+                key = record['k']
+            except (ValueError, KeyError, TypeError):
+                continue  # Corrupt line
+            if record.get('d'):
+                self.entries.pop(key, None)
+            elif self._is_current(key):
+                self.entries[key] = record
+            else:
+                self.entries.pop(key, None)
+
+    def _is_current(self, key: str) -> bool:
+        kind, _, rest = key.partition(':')
+        version = rest.partition(':')[0]
+        return self.prompt_versions.get(kind) == version
+
+    def _import_legacy(self, legacy_path: Path):
+        """One-time import of the old translation_cache.json ({"text" | "variant:text": english})."""
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not import legacy cache {legacy_path}: {e}")
+            return
+        for old_key, text_en in legacy.items():
+            is_variant = old_key.startswith('variant:')
+            text_zh = old_key[len('variant:'):] if is_variant else old_key
+            key = self.key(text_zh, is_variant)
+            self.entries[key] = {'k': key, 'v': text_en, 'm': 'legacy', 't': 0}
+        self.compact()
+        print(f"💾 Imported {len(legacy)} entries from {legacy_path}")
+
+    def get(self, text_zh: str, is_variant: bool = False) -> Optional[str]:
+        record = self.entries.get(self.key(text_zh, is_variant))
+        return record['v'] if record else None
+
+    def put(self, text_zh: str, is_variant: bool, text_en: str, model: str = ''):
+        key = self.key(text_zh, is_variant)
+        record = {'k': key, 'v': text_en, 'm': model, 't': int(time.time())}
+        with self._lock:
+            self.entries[key] = record
+            self._append(record)
+
+    def discard(self, text_zh: str, is_variant: bool = False):
+        key = self.key(text_zh, is_variant)
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._append({'k': key, 'd': 1})
+
+    def _append(self, record: dict):
+        # Caller holds the lock
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._log_lines += 1
+        self._unsynced += 1
+        if self._unsynced >= SYNC_EVERY:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def compact(self):
+        """Rewrite the log with only live, current-version entries (atomic swap)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                for record in self.entries.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._log_lines = len(self.entries)
+            self._unsynced = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+        if self._log_lines - len(self.entries) > max(MIN_COMPACT_LINES, len(self.entries)):
+            self.compact()
+
+    def __len__(self):
+        return len(self.entries)
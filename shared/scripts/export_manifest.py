@@ -7,6 +7,7 @@ Add this to scraper.py after CSV export
 import json
 import os
 import re
+import sys
 from datetime import datetime
 from collections import defaultdict
 
@@ -42,11 +43,25 @@ def categorize_product(title):
     else:
         return 'Tactical Gear'
 
-def export_products_manifest(all_scraped_data, output_dir='../shared/data', script_dir=None):
+def _srcset_loader(media_dir):
+    """scraper/image_derivatives.load_srcsets (next to media_dir), or None if unavailable."""
+    scraper_dir = os.path.dirname(os.path.abspath(media_dir))
+    if scraper_dir not in sys.path:
+        sys.path.insert(0, scraper_dir)
+    try:
+        from image_derivatives import load_srcsets
+        return load_srcsets
+    except ImportError:
+        return None
+
+def export_products_manifest(all_scraped_data, output_dir='../shared/data', script_dir=None, media_dir=None):
     """Export shop-compatible JSON manifest from scraped data"""
     
     if script_dir is None:
         script_dir = os.path.dirname(os.path.abspath(__file__))
+    if media_dir is None:
+        media_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../scraper/media')
+    load_srcsets = _srcset_loader(media_dir)
     
     manifest_path = os.path.join(script_dir, output_dir, 'products_manifest.json')
     catalog_path = os.path.join(script_dir, output_dir, 'catalog_index.json')
@@ -114,8 +129,9 @@ def export_products_manifest(all_scraped_data, output_dir='../shared/data', scri
                 catalogue_img = f"/images/{media_folder_slug}-Catalogue_{i:02d}.jpg"
                 images.append(catalogue_img)
             
-            # Set detail long image path
-            detail_long_image = f"/images/{media_folder_slug}-Details_Long.jpg"
+            # Set detail long image path (a tile index if stitch-details.py --tiles was used)
+            tiled = os.path.exists(os.path.join(media_dir, media_folder, 'Details', 'Details_Long.json'))
+            detail_long_image = f"/images/{media_folder_slug}-Details_Long.{'json' if tiled else 'jpg'}"
         
         # Get average price across variants
         variant_prices = [v['price_cad'] for v in data['variants'] if v['price_cad'] > 0]
@@ -131,6 +147,9 @@ def export_products_manifest(all_scraped_data, output_dir='../shared/data', scri
             'primaryImage': primary_image,
             'images': images[:15],  # Limit to 15 images to avoid huge payloads
             'detailLongImage': detail_long_image,  # Stitched detail image
+            # WebP/AVIF candidates; empty until scraper/image_derivatives.py has run
+            'srcset': load_srcsets(os.path.join(media_dir, media_folder), media_folder_slug)
+                      if load_srcsets and media_folder_slug else {},
             'url': url,
             'category': categorize_product(title),
             'description': f"Imported from Taobao. {title}",
@@ -173,15 +192,15 @@ def export_products_manifest(all_scraped_data, output_dir='../shared/data', scri
         else:
             catalog = {'last_updated': None, 'products': {}}
         
-        # Update catalog with new products
+        # Update catalog with new products (keep scraper-owned keys such as 'fingerprint')
         for product in products:
-            catalog['products'][product['url']] = {
+            catalog['products'].setdefault(product['url'], {}).update({
                 'id': product['id'],
                 'title': product['title'],
                 'last_scraped': datetime.now().isoformat(),
                 'status': 'active',
                 'variants': len(product.get('variants', []))
-            }
+            })
         
         catalog['last_updated'] = datetime.now().isoformat()
         
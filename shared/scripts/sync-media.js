@@ -36,6 +36,14 @@ async function syncMedia() {
     let totalFiles = 0;
     let copiedFiles = 0;
     let skippedFiles = 0;
+    let linkedFiles = 0;
+
+    // The scraper stores media content-addressed (scraper/media/.blobs) and product
+    // files are hardlinks to those blobs. Mirror that here: the first target for a
+    // given source inode is copied, later ones are hardlinked to it.
+    // This only saves local disk: shop/public/images is committed and deployed as
+    // ordinary files, so git and the deploy still upload every linked file in full.
+    const syncedByInode = new Map();
 
     // Copy each product's images
     for (const folder of validFolders) {
@@ -44,8 +52,9 @@ async function syncMedia() {
 
       if (!stats.isDirectory()) continue;
 
-      // Get all image files from this product folder (Main, Details, Catalogue subfolders)
-      const subfolders = ['Main', 'Details', 'Catalogue'];
+      // Get all image files from this product folder (Main, Details, Catalogue subfolders,
+      // plus the WebP/AVIF derivatives written by scraper/image_derivatives.py)
+      const subfolders = ['Main', 'Details', 'Catalogue', 'Derived'];
       
       for (const subfolder of subfolders) {
         const subfolderPath = path.join(sourceFolderPath, subfolder);
@@ -53,7 +62,7 @@ async function syncMedia() {
         if (!await fs.pathExists(subfolderPath)) continue;
 
         const files = await fs.readdir(subfolderPath);
-        const imageFiles = files.filter(f => /\.(jpg|jpeg|png|gif|webp)$/i.test(f));
+        const imageFiles = files.filter(f => /\.(jpg|jpeg|png|gif|webp|avif)$/i.test(f));
         
         // Priority: copy Details_Long.jpg if it exists
         const detailsLongExists = imageFiles.includes('Details_Long.jpg');
@@ -68,6 +77,20 @@ async function syncMedia() {
           console.log(`   ✓ ${targetFilename} (long detail image)`);
         }
 
+        // Tiled long detail image (stitch-details.py --tiles): the tiles are copied below
+        // like any other image; the index is rewritten so each tile points at its synced URL
+        if (subfolder === 'Details' && files.includes('Details_Long.json')) {
+          const productSlug = folder.replace(/^product_\d+_/, '');
+          const targetFilename = `${productSlug}-Details_Long.json`;
+          const index = await fs.readJson(path.join(subfolderPath, 'Details_Long.json'));
+          index.tiles = index.tiles.map(tile => ({ ...tile, src: `/images/${productSlug}-${tile.src}` }));
+          const targetFile = path.join(TARGET_DIR, targetFilename);
+          await fs.remove(targetFile);
+          await fs.writeJson(targetFile, index, { spaces: 2 });
+          copiedFiles++;
+          console.log(`   ✓ ${targetFilename} (long detail tile index, ${index.tiles.length} tiles)`);
+        }
+
         for (const file of imageFiles) {
           totalFiles++;
           const sourceFile = path.join(subfolderPath, file);
@@ -78,21 +101,41 @@ async function syncMedia() {
           const targetFilename = `${productSlug}-${file}`;
           const targetFile = path.join(TARGET_DIR, targetFilename);
 
+          const sourceStats = await fs.stat(sourceFile);
+          const inodeKey = `${sourceStats.dev}:${sourceStats.ino}`;
+
           // Check if file already exists and is identical
           if (await fs.pathExists(targetFile)) {
-            const sourceStats = await fs.stat(sourceFile);
             const targetStats = await fs.stat(targetFile);
             
             if (sourceStats.size === targetStats.size && 
                 sourceStats.mtime <= targetStats.mtime) {
               skippedFiles++;
+              if (sourceStats.nlink > 1 && !syncedByInode.has(inodeKey)) syncedByInode.set(inodeKey, targetFile);
+              continue;
+            }
+          }
+
+          const firstTarget = sourceStats.nlink > 1 ? syncedByInode.get(inodeKey) : undefined;
+
+          // Targets may be hardlinks from an earlier sync: replace, never write through them
+          await fs.remove(targetFile);
+
+          if (firstTarget) {
+            try {
+              await fs.link(firstTarget, targetFile);
+              linkedFiles++;
+              console.log(`   ↪ ${targetFilename} (identical to ${path.basename(firstTarget)})`);
               continue;
+            } catch (linkError) {
+              // Filesystem without hardlinks - fall through to a normal copy
             }
           }
 
           // Copy file
           await fs.copy(sourceFile, targetFile, { overwrite: true });
           copiedFiles++;
+          if (sourceStats.nlink > 1) syncedByInode.set(inodeKey, targetFile);
           console.log(`   ✓ ${targetFilename}`);
         }
       }
@@ -101,6 +144,7 @@ async function syncMedia() {
     console.log('\n✅ Media sync complete!');
     console.log(`   Total files: ${totalFiles}`);
     console.log(`   Copied: ${copiedFiles}`);
+    console.log(`   Linked (duplicate content, local disk only): ${linkedFiles}`);
     console.log(`   Skipped (unchanged): ${skippedFiles}`);
 
   } catch (error) {
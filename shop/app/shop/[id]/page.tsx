@@ -10,6 +10,7 @@ import { CartDrawer } from "@/components/cart-drawer"
 import { useToast } from "@/components/toast-provider"
 import { ArrowLeft, ShoppingCart } from "lucide-react"
 import MultiVariantSelector from "@/components/multi-variant-selector"
+import { DetailLongImage } from "@/components/detail-long-image"
 
 export default function ProductDetailPage({ params }: { params: Promise<{ id: string }> }) {
   const router = useRouter()
@@ -139,12 +140,9 @@ export default function ProductDetailPage({ params }: { params: Promise<{ id: st
             </div>
             {product.detailLongImage && (
               <div className="mt-6">
-                <Image
+                <DetailLongImage
                   src={product.detailLongImage}
                   alt={`${product.title} details`}
-                  width={1200}
-                  height={4000}
-                  className="rounded-xl border border-[#2C2C2C] w-full h-auto"
                 />
               </div>
             )}
@@ -0,0 +1,63 @@
+"use client"
+
+import { useEffect, useState } from "react"
+import Image from "next/image"
+
+// Written by scraper/stitch-details.py --tiles and rewritten by sync-media.js
+type DetailTileIndex = {
+  version: number
+  width: number
+  height: number
+  tileHeight: number
+  format: string
+  tiles: { src: string; height: number }[]
+}
+
+type DetailLongImageProps = {
+  src: string
+  alt: string
+}
+
+export function DetailLongImage({ src, alt }: DetailLongImageProps) {
+  const isTiled = src.endsWith(".json")
+  const [index, setIndex] = useState<DetailTileIndex | null>(null)
+
+  useEffect(() => {
+    if (!isTiled) return
+    fetch(src)
+      .then(res => res.json())
+      .then(setIndex)
+      .catch(error => console.error("Failed to load detail tiles:", error))
+  }, [src, isTiled])
+
+  if (!isTiled) {
+    return (
+      <Image
+        src={src}
+        alt={alt}
+        width={1200}
+        height={4000}
+        className="rounded-xl border border-[#2C2C2C] w-full h-auto"
+      />
+    )
+  }
+
+  if (!index) return null
+
+  // Only the first tile loads eagerly; the rest are lazy-loaded as they scroll into view
+  return (
+    <div className="rounded-xl border border-[#2C2C2C] overflow-hidden">
+      {index.tiles.map((tile, idx) => (
+        <Image
+          key={tile.src}
+          src={tile.src}
+          alt={idx === 0 ? alt : ""}
+          width={index.width}
+          height={tile.height}
+          priority={idx === 0}
+          className="block w-full h-auto"
+        />
+      ))}
+    </div>
+  )
+}
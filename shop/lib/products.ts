@@ -7,7 +7,7 @@ export type Product = {
   // Primary image for listing cards
   primaryImage: string
   images: string[]
-  detailLongImage?: string  // Stitched long detail image for scrolling
+  detailLongImage?: string  // Stitched long detail image (or Details_Long.json tile index) for scrolling
   url: string
   category?: string
   description?: string